@@ -1,7 +1,8 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from app.api.api_v1.endpoints import auth, users, projects, samples, spectra, analysis
 
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=ORJSONResponse)
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
@@ -1,89 +1,152 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import aliased, load_only, raiseload
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from typing import List, Optional
+import logging
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.analysis import Analysis
 from app.models.analysis_history import AnalysisHistory
 from app.models.spectrum import Spectrum
+from app.models.user import User
+from app.utils.http_cache import list_etag, not_modified_response
+from app.utils.pagination import paginate, set_next_cursor
 from app.schemas.analysis import (
     Analysis as AnalysisSchema,
+    AnalysisListItem,
     AnalysisCreate,
     AnalysisUpdate,
     AnalysisHistory as AnalysisHistorySchema
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
-security = HTTPBearer()
+security = HTTPBearer(auto_error=False)
 
 # Simple authentication dependency - gets current user ID from token
 async def get_current_user_id(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db)
 ) -> int:
     """
-    Extract user ID from JWT token.
-    For demo purposes, returns user ID 1 if no token or token verification fails.
-    In production, this should properly validate the token and return the actual user ID.
+    Extract user ID from JWT token by looking up the token's username.
+    For demo purposes, returns user ID 1 if there is no token, the token does not
+    verify, or its user does not exist. In production, this should raise an
+    authentication error instead.
+    The result is kept on request.state so the token is verified once per request.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return user_id
+    
+    username = verify_token(credentials.credentials) if credentials else None
+    if username is not None:
+        user_id = await db.scalar(select(User.id).where(User.username == username))
+    if user_id is None:
+        user_id = 1
+    
+    request.state.user_id = user_id
+    return user_id
+
+async def record_analysis_history(
+    bind: AsyncEngine,
+    analysis_id: int,
+    previous_data: dict,
+    changed_data: dict,
+    changed_by: int
+) -> None:
+    """
+    Write an AnalysisHistory row. Runs as a background task after the response,
+    so it opens its own session instead of reusing the (closed) request session.
     """
     try:
-        if credentials:
-            username = verify_token(credentials.credentials)
-            if username:
-                # In a real implementation, you'd look up the user by username
-                # For demo purposes, assuming user ID 1 for admin
-                return 1
+        async with AsyncSession(bind=bind, expire_on_commit=False) as db:
+            db.add(AnalysisHistory(
+                analysis_id=analysis_id,
+                previous_results=previous_data,
+                new_results=changed_data,
+                changed_by=changed_by,
+                change_description=f"Updated {', '.join(changed_data.keys())}"
+            ))
+            await db.commit()
     except Exception:
-        pass
-    
-    # Default to user ID 1 for demo purposes
-    # In production, this should raise an authentication error
-    return 1
+        logger.exception("Failed to record history for analysis %s", analysis_id)
 
-@router.get("/", response_model=List[AnalysisSchema])
-def read_analyses(
+@router.get("/", response_model=List[AnalysisListItem])
+async def read_analyses(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    after_id: Optional[int] = None,
     spectrum_id: Optional[int] = None,
     method_name: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all analyses with optional filtering by spectrum_id and method_name"""
-    query = db.query(Analysis)
-    
+    """
+    Get all analyses with optional filtering by spectrum_id and method_name.
+    Pass after_id (see the X-Next-Cursor header) instead of skip for deep pages.
+    """
+    filters = []
     if spectrum_id:
-        query = query.filter(Analysis.spectrum_id == spectrum_id)
+        filters.append(Analysis.spectrum_id == spectrum_id)
     if method_name:
-        query = query.filter(Analysis.method_name == method_name)
+        filters.append(Analysis.method_name == method_name)
     
-    analyses = query.offset(skip).limit(limit).all()
+    # Cheap version probe; an unchanged listing is answered with 304 without running the query
+    version = (await db.execute(
+        select(
+            func.count(Analysis.id),
+            func.max(Analysis.id),
+            func.max(func.coalesce(Analysis.updated_at, Analysis.created_at))
+        ).where(*filters)
+    )).one()
+    etag = list_etag(skip, limit, after_id, spectrum_id, method_name, *version)
+    not_modified = not_modified_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    # Listings leave out the parameters/results JSON, so don't fetch those columns.
+    # The response has no relationship fields; fail loudly instead of lazy loading per row
+    query = select(Analysis).options(
+        load_only(
+            Analysis.id, Analysis.spectrum_id, Analysis.method_name,
+            Analysis.created_by, Analysis.created_at,
+            raiseload=True
+        ),
+        raiseload("*")
+    ).where(*filters)
+    
+    analyses = (await db.execute(paginate(query, Analysis.id, skip, limit, after_id))).scalars().all()
+    set_next_cursor(response, [analysis.id for analysis in analyses], limit)
     return analyses
 
 @router.get("/{analysis_id}", response_model=AnalysisSchema)
-def read_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def read_analysis(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific analysis by ID"""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.get(Analysis, analysis_id)
     if analysis is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
     return analysis
 
 @router.post("/", response_model=AnalysisSchema)
-def create_analysis(
+async def create_analysis(
     analysis: AnalysisCreate,
     current_user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new analysis result"""
     try:
         # Verify spectrum exists
-        spectrum = db.query(Spectrum).filter(Spectrum.id == analysis.spectrum_id).first()
+        spectrum = await db.get(Spectrum, analysis.spectrum_id)
         if not spectrum:
             raise HTTPException(status_code=404, detail="Spectrum not found")
         
-        print(f"Creating analysis: {analysis.method_name} for spectrum {analysis.spectrum_id}")
-        print(f"Parameters: {analysis.parameters}")
-        print(f"Results keys: {list(analysis.results.keys()) if analysis.results else 'None'}")
+        logger.debug("Creating analysis %s for spectrum %s", analysis.method_name, analysis.spectrum_id)
         
         db_analysis = Analysis(
             spectrum_id=analysis.spectrum_id,
@@ -94,119 +157,145 @@ def create_analysis(
         )
         
         db.add(db_analysis)
-        db.commit()
-        db.refresh(db_analysis)
-        print(f"Successfully created analysis with ID: {db_analysis.id}")
+        await db.commit()
+        await db.refresh(db_analysis)
+        logger.debug("Created analysis %s", db_analysis.id)
         return db_analysis
         
     except Exception as e:
-        print(f"Error creating analysis: {str(e)}")
-        print(f"Error type: {type(e)}")
-        db.rollback()
+        logger.error("Error creating analysis: %s (%s)", e, type(e).__name__)
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create analysis: {str(e)}")
 
+@router.post("/bulk", response_model=List[AnalysisSchema])
+async def create_analyses_bulk(
+    analyses: List[AnalysisCreate],
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create several analysis results with batched multi-row INSERTs"""
+    if not analyses:
+        return []
+    
+    # Verify all referenced spectra exist with a single query
+    spectrum_ids = {analysis.spectrum_id for analysis in analyses}
+    existing_ids = set((await db.execute(
+        select(Spectrum.id).where(Spectrum.id.in_(spectrum_ids))
+    )).scalars())
+    missing_ids = spectrum_ids - existing_ids
+    if missing_ids:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Spectrum not found: {', '.join(map(str, sorted(missing_ids)))}"
+        )
+    
+    rows = [{**analysis.model_dump(), "created_by": current_user_id} for analysis in analyses]
+    created = (await db.scalars(
+        insert(Analysis).returning(Analysis, sort_by_parameter_order=True), rows
+    )).all()
+    await db.commit()
+    logger.debug("Created %d analyses in bulk", len(created))
+    return created
+
 @router.put("/{analysis_id}", response_model=AnalysisSchema)
-def update_analysis(
+async def update_analysis(
     analysis_id: int,
     analysis_update: AnalysisUpdate,
+    background_tasks: BackgroundTasks,
     current_user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing analysis and track changes"""
     try:
-        db_analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        db_analysis = await db.get(Analysis, analysis_id)
         if not db_analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
         
-        print(f"Updating analysis {analysis_id}: {db_analysis.method_name}")
-        print(f"Update data: {analysis_update.dict(exclude_unset=True)}")
+        logger.debug("Updating analysis %s: %s", analysis_id, db_analysis.method_name)
         
-        # Store previous results for history tracking
-        previous_results = db_analysis.results.copy() if db_analysis.results else {}
-        previous_parameters = db_analysis.parameters.copy() if db_analysis.parameters else {}
+        # Only fields whose value actually changes are applied and tracked
+        update_data = analysis_update.model_dump(exclude_unset=True)
+        changed_data = {
+            field: value for field, value in update_data.items()
+            if getattr(db_analysis, field) != value
+        }
+        if not changed_data:
+            return db_analysis
         
-        # Update fields if provided
-        update_data = analysis_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
+        # setattr rebinds the JSON attributes, so the previous values can be kept without copying
+        previous_data = {field: getattr(db_analysis, field) or {} for field in changed_data}
+        for field, value in changed_data.items():
             setattr(db_analysis, field, value)
         
-        # Create history record
-        history_record = AnalysisHistory(
-            analysis_id=analysis_id,
-            previous_results={"results": previous_results, "parameters": previous_parameters},
-            new_results={"results": db_analysis.results, "parameters": db_analysis.parameters},
-            changed_by=current_user_id,
-            change_description=f"Updated {', '.join(update_data.keys())}"
-        )
+        await db.commit()
+        await db.refresh(db_analysis)
         
-        db.add(history_record)
-        db.commit()
-        db.refresh(db_analysis)
-        print(f"Successfully updated analysis {analysis_id}")
+        # The history row is written after the response has been sent
+        background_tasks.add_task(
+            record_analysis_history, db.bind, analysis_id, previous_data, changed_data, current_user_id
+        )
+        logger.debug("Updated analysis %s", analysis_id)
         return db_analysis
         
     except Exception as e:
-        print(f"Error updating analysis {analysis_id}: {str(e)}")
-        print(f"Error type: {type(e)}")
-        db.rollback()
+        logger.error("Error updating analysis %s: %s (%s)", analysis_id, e, type(e).__name__)
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update analysis: {str(e)}")
 
 @router.get("/{analysis_id}/history", response_model=List[AnalysisHistorySchema])
-def get_analysis_history(analysis_id: int, db: Session = Depends(get_db)):
+async def get_analysis_history(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """Get the change history for an analysis"""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    history = db.query(AnalysisHistory).filter(
-        AnalysisHistory.analysis_id == analysis_id
-    ).order_by(AnalysisHistory.changed_at.desc()).all()
+    history = (await db.execute(
+        select(AnalysisHistory).options(raiseload("*")).where(
+            AnalysisHistory.analysis_id == analysis_id
+        ).order_by(AnalysisHistory.changed_at.desc())
+    )).scalars().all()
     
     return history
 
 @router.delete("/{analysis_id}")
-def delete_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def delete_analysis(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """Delete an analysis (soft delete by marking as deleted)"""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    db.delete(analysis)
-    db.commit()
+    await db.delete(analysis)
+    await db.commit()
     return {"message": "Analysis deleted successfully"}
 
 @router.get("/spectrum/{spectrum_id}/latest", response_model=List[AnalysisSchema])
-def get_latest_analyses_for_spectrum(
+async def get_latest_analyses_for_spectrum(
     spectrum_id: int,
     methods: Optional[List[str]] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get the latest analysis for each method type for a spectrum"""
     # Verify spectrum exists
-    spectrum = db.query(Spectrum).filter(Spectrum.id == spectrum_id).first()
+    spectrum = await db.get(Spectrum, spectrum_id)
     if not spectrum:
         raise HTTPException(status_code=404, detail="Spectrum not found")
     
-    # Build query for latest analyses
-    query = db.query(Analysis).filter(Analysis.spectrum_id == spectrum_id)
+    # Rank analyses per method newest-first and keep the top row of each method
+    ranked = select(
+        Analysis,
+        func.row_number().over(
+            partition_by=Analysis.method_name,
+            order_by=(Analysis.created_at.desc(), Analysis.id.desc())
+        ).label('rn')
+    ).where(Analysis.spectrum_id == spectrum_id)
     
     if methods:
-        query = query.filter(Analysis.method_name.in_(methods))
-    
-    # Get latest analysis for each method
-    analyses = []
-    method_names = db.query(Analysis.method_name).filter(
-        Analysis.spectrum_id == spectrum_id
-    ).distinct().all()
+        ranked = ranked.where(Analysis.method_name.in_(methods))
     
-    for (method_name,) in method_names:
-        if not methods or method_name in methods:
-            latest_analysis = db.query(Analysis).filter(
-                Analysis.spectrum_id == spectrum_id,
-                Analysis.method_name == method_name
-            ).order_by(Analysis.created_at.desc()).first()
-            
-            if latest_analysis:
-                analyses.append(latest_analysis)
+    ranked = ranked.subquery()
+    latest = aliased(Analysis, ranked)
+    analyses = (await db.execute(
+        select(latest).options(raiseload("*")).where(ranked.c.rn == 1)
+    )).scalars().all()
     
     return analyses
\ No newline at end of file
@@ -1,7 +1,9 @@
 from datetime import timedelta
+import hmac
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
@@ -14,11 +16,11 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # For demo purposes, we'll create a simple hardcoded user check
     # In production, this should verify against the database
-    if form_data.username == "admin" and form_data.password == "admin123":
+    if form_data.username == "admin" and hmac.compare_digest(form_data.password.encode(), b"admin123"):
         # Create demo user data
         user_data = {
             "id": "1",
@@ -38,8 +40,11 @@ async def login(
         }
     
     # Check if user exists in database (for future implementation)
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user:
+    # Only the password hash is needed, so skip loading the full User row
+    password_hash = await db.scalar(
+        select(User.password_hash).where(User.username == form_data.username)
+    )
+    if password_hash is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -47,7 +52,7 @@ async def login(
         )
     
     # Verify password (for future implementation)
-    if not verify_password(form_data.password, user.password_hash):
+    if not verify_password(form_data.password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -57,7 +62,7 @@ async def login(
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": form_data.username}, expires_delta=access_token_expires
     )
     
     return {
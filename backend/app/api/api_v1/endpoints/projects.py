@@ -1,29 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.database import get_db
+from app.models.analysis import Analysis
+from app.models.analysis_history import AnalysisHistory
 from app.models.project import Project
 from app.models.sample import Sample
 from app.models.spectrum import Spectrum
 from app.models.user import User
+from app.utils.http_cache import list_etag, not_modified_response
+from app.utils.pagination import paginate, set_next_cursor
 from app.schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate, ProjectWithCounts
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ProjectWithCounts])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all projects with pagination and counts"""
+async def read_projects(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get all projects with pagination and counts.
+    Pass after_id (see the X-Next-Cursor header) instead of skip for deep pages.
+    """
+    # Cheap version probe covering projects and the samples/spectra behind the counts;
+    # an unchanged listing is answered with 304 without running the queries below
+    version = (await db.execute(select(
+        func.count(Project.id),
+        func.max(Project.id),
+        func.max(func.coalesce(Project.updated_at, Project.created_at)),
+        select(func.count(Sample.id)).scalar_subquery(),
+        select(func.max(Sample.id)).scalar_subquery(),
+        select(func.max(func.coalesce(Sample.updated_at, Sample.created_at))).scalar_subquery(),
+        select(func.count(Spectrum.id)).scalar_subquery(),
+        select(func.max(Spectrum.id)).scalar_subquery(),
+        select(func.max(Spectrum.created_at)).scalar_subquery()
+    ))).one()
+    etag = list_etag(skip, limit, after_id, *version)
+    not_modified = not_modified_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
     try:
         # Get projects first
-        projects = db.query(Project).offset(skip).limit(limit).all()
+        projects = (await db.execute(
+            paginate(select(Project), Project.id, skip, limit, after_id)
+        )).scalars().all()
+        project_ids = [project.id for project in projects]
+        set_next_cursor(response, project_ids, limit)
+        
+        # Count samples and spectra for the whole page with one grouped query each;
+        # joining both tables in one query would multiply rows per project
+        samples_counts = dict((await db.execute(
+            select(Sample.project_id, func.count(Sample.id))
+            .where(Sample.project_id.in_(project_ids))
+            .group_by(Sample.project_id)
+        )).all())
+        spectra_counts = dict((await db.execute(
+            select(Sample.project_id, func.count(Spectrum.id))
+            .join(Spectrum, Spectrum.sample_id == Sample.id)
+            .where(Sample.project_id.in_(project_ids))
+            .group_by(Sample.project_id)
+        )).all())
         
+        # Plain dicts: FastAPI validates the whole list against the response_model once,
+        # so building ProjectWithCounts per row would only validate everything twice
         result = []
         for project in projects:
-            # Count samples and spectra for each project separately
-            samples_count = db.query(Sample).filter(Sample.project_id == project.id).count()
-            spectra_count = db.query(Spectrum).join(Sample).filter(Sample.project_id == project.id).count()
-            
             project_dict = {
                 "id": project.id,
                 "name": project.name,
@@ -32,15 +80,17 @@ def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
                 "settings": project.settings or {},
                 "created_at": project.created_at,
                 "updated_at": project.updated_at,
-                "samples_count": samples_count,
-                "spectra_count": spectra_count
+                "samples_count": samples_counts.get(project.id, 0),
+                "spectra_count": spectra_counts.get(project.id, 0)
             }
-            result.append(ProjectWithCounts(**project_dict))
+            result.append(project_dict)
         
         return result
     except Exception as e:
         # For debugging, let's return a simple list for now
-        projects = db.query(Project).offset(skip).limit(limit).all()
+        projects = (await db.execute(
+            paginate(select(Project), Project.id, skip, limit, after_id)
+        )).scalars().all()
         result = []
         for project in projects:
             project_dict = {
@@ -54,19 +104,19 @@ def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
                 "samples_count": 0,
                 "spectra_count": 0
             }
-            result.append(ProjectWithCounts(**project_dict))
+            result.append(project_dict)
         return result
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-def read_project(project_id: int, db: Session = Depends(get_db)):
+async def read_project(project_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific project by ID"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 @router.post("/", response_model=ProjectResponse)
-def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
+async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_db)):
     """Create a new project"""
     
     # For now, we'll default to owner_id = 1 since we don't have authentication
@@ -80,12 +130,12 @@ def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
     #     raise HTTPException(status_code=404, detail="Owner not found")
     
     # Check if project name is unique for this owner
-    existing_project = db.query(Project).filter(
+    name_taken = await db.scalar(select(exists().where(
         Project.owner_id == project.owner_id,
         Project.name == project.name
-    ).first()
+    )))
     
-    if existing_project:
+    if name_taken:
         raise HTTPException(
             status_code=400, 
             detail=f"Project '{project.name}' already exists for this owner"
@@ -94,27 +144,27 @@ def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
     # Create new project
     db_project = Project(**project.model_dump())
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     
     return db_project
 
 @router.put("/{project_id}", response_model=ProjectResponse)
-def update_project(project_id: int, project_update: ProjectUpdate, db: Session = Depends(get_db)):
+async def update_project(project_id: int, project_update: ProjectUpdate, db: AsyncSession = Depends(get_db)):
     """Update a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Check if new name is unique for this owner (if being updated)
     if project_update.name and project_update.name != project.name:
-        existing_project = db.query(Project).filter(
+        name_taken = await db.scalar(select(exists().where(
             Project.owner_id == project.owner_id,
             Project.name == project_update.name,
             Project.id != project_id
-        ).first()
+        )))
         
-        if existing_project:
+        if name_taken:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Project '{project_update.name}' already exists for this owner"
@@ -125,24 +175,45 @@ def update_project(project_id: int, project_update: ProjectUpdate, db: Session =
     for field, value in update_data.items():
         setattr(project, field, value)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return project
 
 @router.delete("/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(get_db)):
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a project and all associated samples and spectra"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    project_exists = await db.scalar(select(exists().where(Project.id == project_id)))
+    if not project_exists:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Count associated data
-    samples_count = db.query(Sample).filter(Sample.project_id == project_id).count()
-    spectra_count = db.query(Spectrum).join(Sample).filter(Sample.project_id == project_id).count()
+    # One set-based DELETE per table, children first, instead of the ORM cascade
+    # loading and deleting every sample, spectrum and analysis row individually
+    project_samples = select(Sample.id).where(Sample.project_id == project_id)
+    project_spectra = select(Spectrum.id).where(Spectrum.sample_id.in_(project_samples))
+    project_analyses = select(Analysis.id).where(Analysis.spectrum_id.in_(project_spectra))
     
-    db.delete(project)
-    db.commit()
+    await db.execute(
+        delete(AnalysisHistory).where(AnalysisHistory.analysis_id.in_(project_analyses)),
+        execution_options={"synchronize_session": False}
+    )
+    await db.execute(
+        delete(Analysis).where(Analysis.spectrum_id.in_(project_spectra)),
+        execution_options={"synchronize_session": False}
+    )
+    spectra_count = (await db.execute(
+        delete(Spectrum).where(Spectrum.sample_id.in_(project_samples)),
+        execution_options={"synchronize_session": False}
+    )).rowcount
+    samples_count = (await db.execute(
+        delete(Sample).where(Sample.project_id == project_id),
+        execution_options={"synchronize_session": False}
+    )).rowcount
+    await db.execute(
+        delete(Project).where(Project.id == project_id),
+        execution_options={"synchronize_session": False}
+    )
+    await db.commit()
     
     return {
         "success": True, 
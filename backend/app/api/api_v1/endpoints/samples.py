@@ -1,25 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_db, upsert_insert
+from app.models.analysis import Analysis
+from app.models.analysis_history import AnalysisHistory
 from app.models.sample import Sample
 from app.models.project import Project
 from app.models.spectrum import Spectrum
+from app.utils.http_cache import list_etag, not_modified_response
+from app.utils.pagination import paginate, set_next_cursor
 from app.schemas.sample import SampleResponse, SampleCreate, SampleUpdate, SampleWithSpectraCount
 
 router = APIRouter()
 
 @router.get("/", response_model=List[SampleWithSpectraCount])
-def read_samples(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all samples with pagination and spectra count"""
-    samples_query = db.query(
+async def read_samples(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get all samples with pagination and spectra count.
+    Pass after_id (see the X-Next-Cursor header) instead of skip for deep pages.
+    """
+    # Cheap version probe covering samples and the spectra behind the counts;
+    # an unchanged listing is answered with 304 without running the query below
+    version = (await db.execute(select(
+        func.count(Sample.id),
+        func.max(Sample.id),
+        func.max(func.coalesce(Sample.updated_at, Sample.created_at)),
+        select(func.count(Spectrum.id)).scalar_subquery(),
+        select(func.max(Spectrum.id)).scalar_subquery(),
+        select(func.max(Spectrum.created_at)).scalar_subquery()
+    ))).one()
+    etag = list_etag(skip, limit, after_id, *version)
+    not_modified = not_modified_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    samples_query = select(
         Sample,
         func.count(Spectrum.id).label('spectra_count')
-    ).outerjoin(Spectrum).group_by(Sample.id).offset(skip).limit(limit)
+    ).outerjoin(Spectrum).group_by(Sample.id)
     
-    samples_with_count = samples_query.all()
+    samples_with_count = (await db.execute(
+        paginate(samples_query, Sample.id, skip, limit, after_id)
+    )).all()
+    set_next_cursor(response, [sample.id for sample, _ in samples_with_count], limit)
     
+    # Plain dicts: FastAPI validates the whole list against the response_model once
     result = []
     for sample, spectra_count in samples_with_count:
         sample_dict = {
@@ -33,63 +66,59 @@ def read_samples(skip: int = 0, limit: int = 100, db: Session = Depends(get_db))
             "created_at": sample.created_at,
             "spectra_count": spectra_count or 0
         }
-        result.append(SampleWithSpectraCount(**sample_dict))
+        result.append(sample_dict)
     
     return result
 
 @router.get("/{sample_id}", response_model=SampleResponse)
-def read_sample(sample_id: int, db: Session = Depends(get_db)):
+async def read_sample(sample_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific sample by ID"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
+    sample = await db.get(Sample, sample_id)
     if sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     return sample
 
 @router.post("/", response_model=SampleResponse)
-def create_sample(sample: SampleCreate, db: Session = Depends(get_db)):
+async def create_sample(sample: SampleCreate, db: AsyncSession = Depends(get_db)):
     """Create a new sample"""
     
     # Validate project exists
-    project = db.query(Project).filter(Project.id == sample.project_id).first()
-    if not project:
+    project_exists = await db.scalar(select(exists().where(Project.id == sample.project_id)))
+    if not project_exists:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if sample_id is unique within the project
-    existing_sample = db.query(Sample).filter(
-        Sample.project_id == sample.project_id,
-        Sample.sample_id == sample.sample_id
-    ).first()
+    # Create new sample; sample_id is unique within the project, so a duplicate inserts nothing
+    insert_sample = upsert_insert(db, Sample).values(**sample.model_dump()).on_conflict_do_nothing(
+        index_elements=[Sample.project_id, Sample.sample_id]
+    ).returning(Sample)
+    db_sample = (await db.execute(insert_sample)).scalars().first()
     
-    if existing_sample:
+    if db_sample is None:
         raise HTTPException(
             status_code=400, 
             detail=f"Sample ID '{sample.sample_id}' already exists in this project"
         )
     
-    # Create new sample
-    db_sample = Sample(**sample.model_dump())
-    db.add(db_sample)
-    db.commit()
-    db.refresh(db_sample)
+    await db.commit()
     
     return db_sample
 
 @router.put("/{sample_id}", response_model=SampleResponse)
-def update_sample(sample_id: int, sample_update: SampleUpdate, db: Session = Depends(get_db)):
+async def update_sample(sample_id: int, sample_update: SampleUpdate, db: AsyncSession = Depends(get_db)):
     """Update a sample"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
+    sample = await db.get(Sample, sample_id)
     if not sample:
         raise HTTPException(status_code=404, detail="Sample not found")
     
     # Check if new sample_id is unique within the project (if being updated)
     if sample_update.sample_id and sample_update.sample_id != sample.sample_id:
-        existing_sample = db.query(Sample).filter(
+        sample_id_taken = await db.scalar(select(exists().where(
             Sample.project_id == sample.project_id,
             Sample.sample_id == sample_update.sample_id,
             Sample.id != sample_id
-        ).first()
+        )))
         
-        if existing_sample:
+        if sample_id_taken:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Sample ID '{sample_update.sample_id}' already exists in this project"
@@ -100,23 +129,40 @@ def update_sample(sample_id: int, sample_update: SampleUpdate, db: Session = Dep
     for field, value in update_data.items():
         setattr(sample, field, value)
     
-    db.commit()
-    db.refresh(sample)
+    await db.commit()
+    await db.refresh(sample)
     
     return sample
 
 @router.delete("/{sample_id}")
-def delete_sample(sample_id: int, db: Session = Depends(get_db)):
+async def delete_sample(sample_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a sample and all associated spectra"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
-    if not sample:
+    sample_exists = await db.scalar(select(exists().where(Sample.id == sample_id)))
+    if not sample_exists:
         raise HTTPException(status_code=404, detail="Sample not found")
     
-    # Count associated spectra
-    spectra_count = db.query(Spectrum).filter(Spectrum.sample_id == sample_id).count()
+    # One set-based DELETE per table, children first, instead of the ORM cascade
+    # loading and deleting every spectrum and analysis row individually
+    sample_spectra = select(Spectrum.id).where(Spectrum.sample_id == sample_id)
+    sample_analyses = select(Analysis.id).where(Analysis.spectrum_id.in_(sample_spectra))
     
-    db.delete(sample)
-    db.commit()
+    await db.execute(
+        delete(AnalysisHistory).where(AnalysisHistory.analysis_id.in_(sample_analyses)),
+        execution_options={"synchronize_session": False}
+    )
+    await db.execute(
+        delete(Analysis).where(Analysis.spectrum_id.in_(sample_spectra)),
+        execution_options={"synchronize_session": False}
+    )
+    spectra_count = (await db.execute(
+        delete(Spectrum).where(Spectrum.sample_id == sample_id),
+        execution_options={"synchronize_session": False}
+    )).rowcount
+    await db.execute(
+        delete(Sample).where(Sample.id == sample_id),
+        execution_options={"synchronize_session": False}
+    )
+    await db.commit()
     
     return {
         "success": True, 
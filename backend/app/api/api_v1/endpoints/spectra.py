@@ -1,27 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import Response
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload
+from tempfile import SpooledTemporaryFile
+from typing import Iterator, List, Optional, Sequence, Tuple
+from app.core.database import get_db, upsert_insert
 from app.models.spectrum import Spectrum
 from app.models.sample import Sample
-from app.schemas.spectrum import SpectrumResponse, SpectrumCreate, FileUploadResponse
-from app.utils.file_parsers import SpectralFileParser
+from app.models.types import FloatArray
+from app.schemas.spectrum import SpectrumResponse, SpectrumSummary, SpectrumCreate, FileUploadResponse
+from app.utils.file_parsers import SpectralFileParser, value_range
+from app.utils.pagination import paginate, set_next_cursor
+import asyncio
+import hashlib
 import io
-import json
+import numpy as np
+import os
+import orjson
 
 router = APIRouter()
 
-@router.get("/", response_model=List[SpectrumResponse])
-def read_spectra(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all spectra with pagination"""
-    spectra = db.query(Spectrum).offset(skip).limit(limit).all()
-    return spectra
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+EXPORT_BATCH_ROWS = 4096
+ALLOWED_EXTENSIONS = frozenset({'.csv', '.dx', '.jdx', '.jcamp', '.txt'})
+VALID_TECHNIQUES = frozenset({"IR", "Raman", "UV-Vis", "LIBS", "XRF", "NMR", "MS", "Unknown"})
+# JCAMP-DX ##DATA TYPE per technique
+JCAMP_DATA_TYPES = {
+    "IR": "INFRARED SPECTRUM",
+    "Raman": "RAMAN SPECTRUM",
+    "UV-Vis": "UV/VIS SPECTRUM",
+    "LIBS": "EMISSION SPECTRUM",
+    "XRF": "X-RAY FLUORESCENCE SPECTRUM",
+    "NMR": "NMR SPECTRUM",
+    "MS": "MASS SPECTRUM"
+}
+# JCAMP-DX (##XUNITS, ##YUNITS) per technique; None means "take it from the file metadata"
+JCAMP_UNITS = {
+    "IR": ("1/CM", None),
+    "Raman": ("1/CM", "INTENSITY"),
+    "UV-Vis": ("NANOMETERS", "ABSORBANCE")
+}
+JCAMP_DEFAULT_YUNITS = {"IR": "TRANSMITTANCE"}
+# Columns each export format reads; everything else stays in the database
+EXPORT_COLUMNS = {
+    "csv": (Spectrum.filename, Spectrum.wavelengths, Spectrum.intensities),
+    "jcamp": (
+        Spectrum.filename, Spectrum.technique, Spectrum.acquisition_parameters,
+        Spectrum.wavelengths, Spectrum.intensities
+    ),
+    "json": (
+        Spectrum.filename, Spectrum.technique, Spectrum.sample_id, Spectrum.acquisition_parameters,
+        Spectrum.wavelengths, Spectrum.intensities, Spectrum.created_at
+    )
+}
+# repr() of each float: the shortest text that reads back to the same value
+EXPORT_FLOAT_FORMAT = "%r"
+
+async def spool_upload(file: UploadFile, max_size: int = MAX_UPLOAD_SIZE) -> Tuple[SpooledTemporaryFile, str]:
+    """
+    Copy an upload into a spooled temp file chunk by chunk, rejecting it as soon
+    as it grows past max_size instead of buffering the whole body first.
+    Returns the rewound spool and the SHA-256 hex digest of its content.
+    """
+    spool = SpooledTemporaryFile(max_size=UPLOAD_CHUNK_SIZE)
+    hasher = hashlib.sha256()
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_size:
+            spool.close()
+            raise HTTPException(status_code=400, detail="File too large. Maximum size is 10MB")
+        hasher.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, hasher.hexdigest()
+
+def iter_data_rows(wavelengths: Sequence[float], intensities: Sequence[float], sep: str) -> Iterator[bytes]:
+    """
+    Yield encoded "x<sep>y" lines in batches of EXPORT_BATCH_ROWS. Each batch is
+    rendered by a single %-format over a repeated row template, which is linear
+    and avoids the per-row write calls np.savetxt makes.
+    """
+    rows = np.column_stack((
+        np.asarray(wavelengths, dtype=np.float64),
+        np.asarray(intensities, dtype=np.float64)
+    ))
+    row_format = f"{EXPORT_FLOAT_FORMAT}{sep}{EXPORT_FLOAT_FORMAT}\n"
+    for start in range(0, len(rows), EXPORT_BATCH_ROWS):
+        batch = rows[start:start + EXPORT_BATCH_ROWS]
+        yield ((row_format * len(batch)) % tuple(batch.ravel().tolist())).encode()
+
+@router.get("/", response_model=List[SpectrumSummary])
+async def read_spectra(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get all spectra with pagination, without their data arrays.
+    Pass after_id (see the X-Next-Cursor header) instead of skip for deep pages.
+    """
+    # The arrays never leave the database; the point count comes from the blob size
+    spectra_query = select(
+        Spectrum.id,
+        Spectrum.sample_id,
+        Spectrum.technique,
+        Spectrum.filename,
+        Spectrum.acquisition_parameters,
+        Spectrum.file_hash,
+        (func.length(Spectrum.wavelengths) // FloatArray.dtype.itemsize).label("data_points"),
+        Spectrum.created_at
+    )
+    spectra = (await db.execute(
+        paginate(spectra_query, Spectrum.id, skip, limit, after_id)
+    )).mappings().all()
+    set_next_cursor(response, [spectrum["id"] for spectrum in spectra], limit)
+    return [dict(spectrum) for spectrum in spectra]
 
 @router.get("/{spectrum_id}", response_model=SpectrumResponse)
-def read_spectrum(spectrum_id: int, db: Session = Depends(get_db)):
+async def read_spectrum(spectrum_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific spectrum by ID"""
-    spectrum = db.query(Spectrum).filter(Spectrum.id == spectrum_id).first()
+    spectrum = await db.get(Spectrum, spectrum_id)
     if spectrum is None:
         raise HTTPException(status_code=404, detail="Spectrum not found")
     return spectrum
@@ -30,24 +133,25 @@ def read_spectrum(spectrum_id: int, db: Session = Depends(get_db)):
 async def debug_upload_spectrum_file(
     file: UploadFile = File(...),
     sample_id: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Debug version of upload endpoint to see parsing details"""
     
-    content = await file.read()
+    spool, file_hash = await spool_upload(file)
     
     try:
-        # Parse the spectral file
-        wavelengths, intensities, metadata, technique = SpectralFileParser.parse_spectrum_file(
-            content, file.filename
-        )
+        # Parse the spectral file in a worker thread so the event loop stays free
+        with spool:
+            wavelengths, intensities, metadata, technique = await asyncio.to_thread(
+                SpectralFileParser.parse_spectrum_file, spool, file.filename, file_hash=file_hash
+            )
         
         return {
             "filename": file.filename,
             "detected_technique": technique,
             "metadata": metadata,
             "data_points": len(wavelengths),
-            "wavelength_range": [min(wavelengths), max(wavelengths)] if wavelengths else None
+            "wavelength_range": value_range(wavelengths)
         }
         
     except Exception as e:
@@ -61,36 +165,49 @@ async def upload_spectrum_file(
     file: UploadFile = File(...),
     sample_id: int = Form(...),
     manual_technique: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload and parse a spectral data file"""
     
     # Validate sample exists
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
-    if not sample:
+    sample_exists = await db.scalar(select(exists().where(Sample.id == sample_id)))
+    if not sample_exists:
         raise HTTPException(status_code=404, detail="Sample not found")
     
     # Validate file type
-    allowed_extensions = {'.csv', '.dx', '.jdx', '.jcamp', '.txt'}
-    file_extension = '.' + file.filename.split('.')[-1].lower() if '.' in file.filename else ''
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Unsupported file format. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+        )
     
-    if file_extension not in allowed_extensions:
+    # Validate technique if manually provided, before any of the body is read
+    if manual_technique and manual_technique not in VALID_TECHNIQUES:
         raise HTTPException(
             status_code=400, 
-            detail=f"Unsupported file format. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"Invalid technique. Must be one of: {', '.join(sorted(VALID_TECHNIQUES))}"
         )
     
-    # Check file size (limit to 10MB)
-    max_size = 10 * 1024 * 1024  # 10MB
-    content = await file.read()
-    if len(content) > max_size:
-        raise HTTPException(status_code=400, detail="File too large. Maximum size is 10MB")
+    # Check file size (limit to 10MB) and hash the content while reading
+    spool, file_hash = await spool_upload(file)
     
-    try:
-        # Parse the spectral file
-        wavelengths, intensities, metadata, technique = SpectralFileParser.parse_spectrum_file(
-            content, file.filename
+    # Check if spectrum with same hash already exists before parsing anything
+    existing_id = await db.scalar(select(Spectrum.id).where(Spectrum.file_hash == file_hash))
+    if existing_id is not None:
+        spool.close()
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Spectrum already exists (ID: {existing_id})"
         )
+    
+    try:
+        # Parse the spectral file in a worker thread so the event loop stays free
+        with spool:
+            wavelengths, intensities, metadata, technique = await asyncio.to_thread(
+                SpectralFileParser.parse_spectrum_file, spool, file.filename, file_hash=file_hash
+            )
         
         # Use manual technique if provided and auto-detection failed
         if manual_technique and technique == "Unknown":
@@ -101,26 +218,9 @@ async def upload_spectrum_file(
             metadata["manual_technique_provided"] = manual_technique
             metadata["auto_detected_technique"] = technique
         
-        # Validate technique if manually provided
-        if manual_technique:
-            valid_techniques = ["IR", "Raman", "UV-Vis", "LIBS", "XRF", "NMR", "MS", "Unknown"]
-            if manual_technique not in valid_techniques:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Invalid technique. Must be one of: {', '.join(valid_techniques)}"
-                )
-        
-        # Check if spectrum with same hash already exists
-        file_hash = metadata.get('file_hash')
-        existing_spectrum = db.query(Spectrum).filter(Spectrum.file_hash == file_hash).first()
-        if existing_spectrum:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Spectrum already exists (ID: {existing_spectrum.id})"
-            )
-        
-        # Create new spectrum record
-        new_spectrum = Spectrum(
+        # Create new spectrum record; the unique file_hash index makes a
+        # concurrent upload of the same file lose here instead of duplicating it
+        insert_spectrum = upsert_insert(db, Spectrum).values(
             sample_id=sample_id,
             technique=technique,
             filename=file.filename,
@@ -128,33 +228,42 @@ async def upload_spectrum_file(
             intensities=intensities,
             acquisition_parameters=metadata,
             file_hash=file_hash
-        )
+        ).on_conflict_do_nothing(index_elements=[Spectrum.file_hash]).returning(Spectrum.id)
+        spectrum_id = await db.scalar(insert_spectrum)
         
-        db.add(new_spectrum)
-        db.commit()
-        db.refresh(new_spectrum)
+        if spectrum_id is None:
+            await db.rollback()
+            existing_id = await db.scalar(select(Spectrum.id).where(Spectrum.file_hash == file_hash))
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Spectrum already exists (ID: {existing_id})"
+            )
+        
+        await db.commit()
         
         return FileUploadResponse(
             success=True,
             message="File uploaded and processed successfully",
-            spectrum_id=new_spectrum.id,
+            spectrum_id=spectrum_id,
             filename=file.filename,
             technique=technique,
             data_points=len(wavelengths)
         )
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/", response_model=SpectrumResponse)
-def create_spectrum(spectrum: SpectrumCreate, db: Session = Depends(get_db)):
+async def create_spectrum(spectrum: SpectrumCreate, db: AsyncSession = Depends(get_db)):
     """Create a new spectrum manually (for programmatic data entry)"""
     
     # Validate sample exists
-    sample = db.query(Sample).filter(Sample.id == spectrum.sample_id).first()
-    if not sample:
+    sample_exists = await db.scalar(select(exists().where(Sample.id == spectrum.sample_id)))
+    if not sample_exists:
         raise HTTPException(status_code=404, detail="Sample not found")
     
     # Validate data arrays have same length
@@ -166,51 +275,57 @@ def create_spectrum(spectrum: SpectrumCreate, db: Session = Depends(get_db)):
     
     db_spectrum = Spectrum(**spectrum.model_dump())
     db.add(db_spectrum)
-    db.commit()
-    db.refresh(db_spectrum)
+    await db.commit()
+    await db.refresh(db_spectrum)
     
     return db_spectrum
 
 @router.delete("/{spectrum_id}")
-def delete_spectrum(spectrum_id: int, db: Session = Depends(get_db)):
+async def delete_spectrum(spectrum_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a spectrum"""
-    spectrum = db.query(Spectrum).filter(Spectrum.id == spectrum_id).first()
+    spectrum = await db.get(Spectrum, spectrum_id)
     if not spectrum:
         raise HTTPException(status_code=404, detail="Spectrum not found")
     
-    db.delete(spectrum)
-    db.commit()
+    await db.delete(spectrum)
+    await db.commit()
     
     return {"success": True, "message": "Spectrum deleted successfully"}
 
 @router.get("/{spectrum_id}/export")
-def export_spectrum(
+async def export_spectrum(
     spectrum_id: int, 
     format: str = "jcamp",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Export a spectrum in specified format (csv, jcamp, json)"""
-    spectrum = db.query(Spectrum).filter(Spectrum.id == spectrum_id).first()
-    if not spectrum:
-        raise HTTPException(status_code=404, detail="Spectrum not found")
-    
     format = format.lower()
-    if format not in ["csv", "jcamp", "json"]:
+    if format not in EXPORT_COLUMNS:
         raise HTTPException(
             status_code=400, 
             detail="Invalid format. Supported formats: csv, jcamp, json"
         )
     
+    # Load only the columns this format writes; nothing else may be lazy loaded
+    spectrum = (await db.execute(
+        select(Spectrum).options(
+            load_only(*EXPORT_COLUMNS[format], raiseload=True),
+            raiseload("*")
+        ).where(Spectrum.id == spectrum_id)
+    )).scalars().first()
+    if not spectrum:
+        raise HTTPException(status_code=404, detail="Spectrum not found")
+    
     filename = f"{spectrum.filename.rsplit('.', 1)[0]}.{format}"
     
     if format == "csv":
         # Export as CSV
-        content = "wavelength,intensity\n"
-        for w, i in zip(spectrum.wavelengths, spectrum.intensities):
-            content += f"{w},{i}\n"
+        def csv_rows() -> Iterator[bytes]:
+            yield b"wavelength,intensity\n"
+            yield from iter_data_rows(spectrum.wavelengths, spectrum.intensities, ",")
         
-        return Response(
-            content=content,
+        return StreamingResponse(
+            csv_rows(),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -228,7 +343,7 @@ def export_spectrum(
         }
         
         return Response(
-            content=json.dumps(data, indent=2),
+            content=orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY),
             media_type="application/json",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -243,16 +358,7 @@ def export_spectrum(
         jcamp_content.append("##JCAMP-DX= 4.24")
         
         # Determine data type from technique
-        data_type_map = {
-            "IR": "INFRARED SPECTRUM",
-            "Raman": "RAMAN SPECTRUM", 
-            "UV-Vis": "UV/VIS SPECTRUM",
-            "LIBS": "EMISSION SPECTRUM",
-            "XRF": "X-RAY FLUORESCENCE SPECTRUM",
-            "NMR": "NMR SPECTRUM",
-            "MS": "MASS SPECTRUM"
-        }
-        data_type = data_type_map.get(spectrum.technique, "SPECTRUM")
+        data_type = JCAMP_DATA_TYPES.get(spectrum.technique, "SPECTRUM")
         jcamp_content.append(f"##DATA TYPE= {data_type}")
         
         # Add metadata fields
@@ -260,39 +366,32 @@ def export_spectrum(
         jcamp_content.append("##OWNER= " + (metadata.get("owner", "User") or "User"))
         
         # Units based on technique
-        if spectrum.technique == "IR":
-            xunits = "1/CM"
-            yunits = metadata.get("yunits", "TRANSMITTANCE") or "TRANSMITTANCE"
-        elif spectrum.technique == "Raman":
-            xunits = "1/CM"  
-            yunits = "INTENSITY"
-        elif spectrum.technique == "UV-Vis":
-            xunits = "NANOMETERS"
-            yunits = "ABSORBANCE"
-        else:
-            xunits = metadata.get("xunits", "X-UNITS") or "X-UNITS"
-            yunits = metadata.get("yunits", "Y-UNITS") or "Y-UNITS"
+        xunits, yunits = JCAMP_UNITS.get(spectrum.technique, (None, None))
+        xunits = xunits or metadata.get("xunits") or "X-UNITS"
+        yunits = yunits or metadata.get("yunits") or JCAMP_DEFAULT_YUNITS.get(spectrum.technique, "Y-UNITS")
             
         jcamp_content.append(f"##XUNITS= {xunits}")
         jcamp_content.append(f"##YUNITS= {yunits}")
         
         # Data range
-        if spectrum.wavelengths:
-            jcamp_content.append(f"##FIRSTX= {min(spectrum.wavelengths)}")
-            jcamp_content.append(f"##LASTX= {max(spectrum.wavelengths)}")
-            jcamp_content.append(f"##NPOINTS= {len(spectrum.wavelengths)}")
+        wavelengths = np.asarray(spectrum.wavelengths, dtype=np.float64)
+        x_range = value_range(wavelengths)
+        if x_range:
+            jcamp_content.append(f"##FIRSTX= {x_range[0]}")
+            jcamp_content.append(f"##LASTX= {x_range[1]}")
+            jcamp_content.append(f"##NPOINTS= {wavelengths.size}")
         
         # Data section
         jcamp_content.append("##XYDATA= (X++(Y..Y))")
-        for w, i in zip(spectrum.wavelengths, spectrum.intensities):
-            jcamp_content.append(f"{w} {i}")
+        header = ("\n".join(jcamp_content) + "\n").encode()
         
-        jcamp_content.append("##END=")
+        def jcamp_rows() -> Iterator[bytes]:
+            yield header
+            yield from iter_data_rows(wavelengths, spectrum.intensities, " ")
+            yield b"##END="
         
-        content = "\n".join(jcamp_content)
-        
-        return Response(
-            content=content,
+        return StreamingResponse(
+            jcamp_rows(),
             media_type="text/plain",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
\ No newline at end of file
@@ -1,42 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.user import User
+from app.utils.pagination import paginate, set_next_cursor
 
 router = APIRouter()
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # Reuse the user resolved earlier in this request, if any
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user
+    
     username = verify_token(credentials.credentials)
     if username is None:
         raise HTTPException(status_code=401, detail="Invalid token")
     
     # For demo purposes, return hardcoded admin user
     if username == "admin":
-        return {
+        request.state.current_user = {
             "id": "1",
             "username": "admin",
             "email": "admin@example.com",
             "role": "admin",
             "created_at": "2024-01-01T00:00:00Z"
         }
+        return request.state.current_user
     
     raise HTTPException(status_code=404, detail="User not found")
 
 @router.get("/me")
-def read_current_user(current_user = Depends(get_current_user)):
+async def read_current_user(current_user = Depends(get_current_user)):
     return current_user
 
 @router.get("/")
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = db.query(User).offset(skip).limit(limit).all()
+async def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    users = (await db.execute(paginate(select(User), User.id, skip, limit, after_id))).scalars().all()
+    set_next_cursor(response, [user.id for user in users], limit)
     return users
 
 @router.get("/{user_id}")
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def read_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
\ No newline at end of file
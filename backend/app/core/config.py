@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import List, Union
 from pydantic import validator
 from pydantic_settings import BaseSettings
@@ -15,6 +16,24 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "oap_password")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "oap_db")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./oap.db")
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self) -> str:
+        """DATABASE_URL rewritten to use an async driver (aiosqlite / asyncpg)"""
+        if self.DATABASE_URL.startswith("sqlite://"):
+            return self.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        if self.DATABASE_URL.startswith(("postgresql://", "postgresql+psycopg2://")):
+            return "postgresql+asyncpg://" + self.DATABASE_URL.split("://", 1)[1]
+        return self.DATABASE_URL
+
+    # Connection pool (ignored for SQLite). Each uvicorn worker holds its own pool, so
+    # the total number of DB connections is up to workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    # Set when connecting through PgBouncer in transaction pooling mode (e.g. port 6432)
+    DB_USE_PGBOUNCER: bool = False
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -39,4 +58,9 @@ class Settings(BaseSettings):
     class Config:
         case_sensitive = True
 
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """Settings are read from the environment once per process"""
+    return Settings()
+
+settings = get_settings()
\ No newline at end of file
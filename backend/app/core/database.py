@@ -1,16 +1,32 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine_options = {"pool_pre_ping": True}
+if settings.DB_USE_PGBOUNCER:
+    # PgBouncer does the pooling; prepared statements don't survive transaction pooling
+    engine_options.update(poolclass=NullPool, connect_args={"statement_cache_size": 0})
+elif not settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+    engine_options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options)
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+def upsert_insert(db: AsyncSession, model):
+    """INSERT construct for the session's dialect, supporting ON CONFLICT clauses"""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
\ No newline at end of file
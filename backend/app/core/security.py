@@ -1,13 +1,21 @@
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Any, Union
+import hashlib
+import time
 
-from jose import JWTError, jwt
+from cachetools import TTLCache
+import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Recently verified tokens: token digest -> (username, exp timestamp)
+_verified_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_verified_tokens_lock = Lock()
+
 def create_access_token(
     data: dict[str, Any], expires_delta: Union[timedelta, None] = None
 ) -> str:
@@ -27,11 +35,22 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_token(token: str) -> Union[str, None]:
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _verified_tokens_lock:
+        cached = _verified_tokens.get(cache_key)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             return None
-        return username
-    except JWTError:
-        return None
\ No newline at end of file
+    except jwt.PyJWTError:
+        return None
+
+    # Tokens without an exp claim are cached for the TTL only
+    expires_at = payload.get("exp", float("inf"))
+    with _verified_tokens_lock:
+        _verified_tokens[cache_key] = (username, expires_at)
+    return username
\ No newline at end of file
@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from app.api.api_v1.api import api_router
+from app.utils.pagination import NEXT_CURSOR_HEADER
 import logging
 
 # Configure logging to show INFO level messages
@@ -11,6 +14,7 @@ app = FastAPI(
     title="Open Analytical Platform API",
     description="API for analytical chemistry data management and analysis",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -19,8 +23,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Spectrum arrays and exports are large, highly compressible numeric text
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
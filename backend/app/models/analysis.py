@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import utcnow
 
 class Analysis(Base):
     __tablename__ = "analyses"
@@ -12,7 +13,13 @@ class Analysis(Base):
     parameters = Column(JSON, default={})
     results = Column(JSON, default={})
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
+
+    __table_args__ = (
+        # Serves the spectrum/method filters and the latest-per-method lookup
+        Index("ix_analyses_spectrum_method_created", spectrum_id, method_name, created_at.desc()),
+    )
 
     # Relationships
     spectrum = relationship("Spectrum", back_populates="analyses")
@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import utcnow
 
 class Project(Base):
     __tablename__ = "projects"
@@ -11,8 +12,8 @@ class Project(Base):
     description = Column(String)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     settings = Column(JSON, default={})
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     owner = relationship("User", back_populates="owned_projects")
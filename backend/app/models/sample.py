@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import utcnow
 
 class Sample(Base):
     __tablename__ = "samples"
@@ -13,7 +14,13 @@ class Sample(Base):
     description = Column(String)
     sample_type = Column(String)
     sample_metadata = Column(JSON, default={})
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
+
+    __table_args__ = (
+        # Sample IDs are unique within a project; also covers lookups by project_id
+        Index("uq_samples_project_sample", project_id, sample_id, unique=True),
+    )
 
     # Relationships
     project = relationship("Project", back_populates="samples")
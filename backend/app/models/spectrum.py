@@ -2,19 +2,20 @@ from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import FloatArray, utcnow
 
 class Spectrum(Base):
     __tablename__ = "spectra"
 
     id = Column(Integer, primary_key=True, index=True)
-    sample_id = Column(Integer, ForeignKey("samples.id"), nullable=False)
+    sample_id = Column(Integer, ForeignKey("samples.id"), nullable=False, index=True)
     technique = Column(String, nullable=False)  # UV-Vis, IR, Raman, etc.
     filename = Column(String, nullable=False)
-    wavelengths = Column(JSON, nullable=False)  # Array of float values stored as JSON
-    intensities = Column(JSON, nullable=False)  # Array of float values stored as JSON
+    wavelengths = Column(FloatArray, nullable=False)  # Array of float values packed as float64
+    intensities = Column(FloatArray, nullable=False)  # Array of float values packed as float64
     acquisition_parameters = Column(JSON, default={})
-    file_hash = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    file_hash = Column(String, unique=True, index=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
     # Relationships
     sample = relationship("Sample", back_populates="spectra")
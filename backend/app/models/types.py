@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class FloatArray(TypeDecorator):
+    """
+    Array of floats stored as packed little-endian float64 bytes.
+    Accepts lists or arrays and reads back a read-only float64 ndarray.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    dtype = np.dtype("<f8")
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return np.asarray(value, dtype=self.dtype).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=self.dtype)
+
+
+def utcnow() -> datetime:
+    """
+    Timestamp for created_at/updated_at, set from Python so it keeps microseconds.
+    SQLite's CURRENT_TIMESTAMP only has whole seconds, which is too coarse for
+    the list ETags built from these columns.
+    """
+    return datetime.now(timezone.utc)
@@ -14,6 +14,17 @@ class AnalysisUpdate(BaseModel):
     parameters: Optional[Dict[str, Any]] = None
     results: Optional[Dict[str, Any]] = None
 
+class AnalysisListItem(BaseModel):
+    """Analysis without its parameters/results payloads, for list responses"""
+    id: int
+    spectrum_id: int
+    method_name: str
+    created_by: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class AnalysisInDBBase(AnalysisBase):
     id: int
     spectrum_id: int
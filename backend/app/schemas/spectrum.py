@@ -1,13 +1,14 @@
-from typing import List, Optional, Dict, Any
+from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
+from app.schemas.types import NDArrayF64
 
 
 class SpectrumBase(BaseModel):
     technique: str = Field(..., description="Spectroscopic technique (UV-Vis, IR, Raman, LIBS, X-ray)")
     filename: str = Field(..., description="Original filename")
-    wavelengths: List[float] = Field(..., description="Array of wavelength/wavenumber values")
-    intensities: List[float] = Field(..., description="Array of intensity values")
+    wavelengths: NDArrayF64 = Field(..., description="Array of wavelength/wavenumber values")
+    intensities: NDArrayF64 = Field(..., description="Array of intensity values")
     acquisition_parameters: Optional[Dict[str, Any]] = Field(default={}, description="Instrument parameters")
 
 
@@ -18,8 +19,8 @@ class SpectrumCreate(SpectrumBase):
 class SpectrumUpdate(BaseModel):
     technique: Optional[str] = None
     filename: Optional[str] = None
-    wavelengths: Optional[List[float]] = None
-    intensities: Optional[List[float]] = None
+    wavelengths: Optional[NDArrayF64] = None
+    intensities: Optional[NDArrayF64] = None
     acquisition_parameters: Optional[Dict[str, Any]] = None
 
 
@@ -33,6 +34,21 @@ class SpectrumResponse(SpectrumBase):
         from_attributes = True
 
 
+class SpectrumSummary(BaseModel):
+    """Spectrum without its wavelengths/intensities arrays, for list responses"""
+    id: int
+    sample_id: int
+    technique: str
+    filename: str
+    acquisition_parameters: Optional[Dict[str, Any]] = None
+    file_hash: Optional[str] = None
+    data_points: int = Field(description="Number of points in the spectrum")
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class FileUploadResponse(BaseModel):
     success: bool
     message: str
@@ -0,0 +1,38 @@
+from typing import Annotated
+
+import numpy as np
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
+
+
+def _as_float_array(value) -> np.ndarray:
+    """
+    Coerce input to a 1-D float64 array; arrays already in that form are not copied.
+    Other input (request JSON) must hold finite numbers only: null, strings and
+    NaN/inf are rejected like a strict List[float] would
+    """
+    if isinstance(value, np.ndarray) and value.dtype == np.float64:
+        array = value
+    else:
+        try:
+            array = np.asarray(value)
+        except (TypeError, ValueError):
+            raise ValueError("Input should be an array of numbers")
+        # null gives an object array and strings a str array; bools are not numbers either
+        if array.dtype.kind not in "iuf":
+            raise ValueError("Input should be an array of numbers")
+        array = array.astype(np.float64, copy=False)
+        if not np.isfinite(array).all():
+            raise ValueError("Input should be an array of finite numbers")
+    if array.ndim != 1:
+        raise ValueError("Input should be a one-dimensional array of numbers")
+    return array
+
+
+# Array of floats held as a float64 ndarray. Validation is a single numpy
+# conversion instead of per-element float checks; JSON output is a list.
+NDArrayF64 = Annotated[
+    np.ndarray,
+    PlainValidator(_as_float_array),
+    PlainSerializer(lambda array: array.tolist(), return_type=list, when_used="json"),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
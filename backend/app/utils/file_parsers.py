@@ -1,16 +1,110 @@
-import csv
 import hashlib
 import numpy as np
-from typing import Tuple, List, Dict, Any, Optional
-from io import StringIO
+from cachetools import LRUCache
+from threading import Lock
+from typing import Tuple, Dict, Any, Optional, BinaryIO, Sequence, Union
+from io import BytesIO, StringIO
+from itertools import chain
 import jcamp
 import logging
+import re
+import warnings
+
+__all__ = ['SpectralFileParser', 'value_range']
 
 logger = logging.getLogger(__name__)
 
+HASH_CHUNK_SIZE = 64 * 1024
+JCAMP_EXTENSIONS = ('.dx', '.jdx', '.jcamp')
+# Bytes of the first CSV line looked at when deciding whether it is a header
+HEADER_PROBE_SIZE = 4096
+# Budget for the parsed-file cache, counted as 8 bytes per stored value
+PARSE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _parsed_size(entry: Tuple) -> int:
+    return 8 * (len(entry[0]) + len(entry[1]))
+
+
+# Recently parsed files: (file hash, filename) -> (wavelengths, intensities, metadata, technique)
+_parsed_files: LRUCache = LRUCache(maxsize=PARSE_CACHE_BYTES, getsizeof=_parsed_size)
+_parsed_files_lock = Lock()
+
+
+def _keywords(*keywords: str) -> re.Pattern:
+    """Compile a substring alternation, so one search replaces an any(k in s ...) chain"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+# JCAMP technique keywords per metadata field (matched against upper-cased values),
+# checked in priority order
+_DATA_TYPE_TECHNIQUES = (
+    ('IR', _keywords('INFRARED', 'IR SPECTRUM', 'FTIR')),
+    ('Raman', _keywords('RAMAN')),
+    ('UV-Vis', _keywords('ULTRAVIOLET', 'UV', 'VISIBLE', 'UV/VIS')),
+    ('MS', _keywords('MASS', 'MS')),
+    ('NMR', _keywords('NMR')),
+)
+_TITLE_TECHNIQUES = (
+    ('IR', _keywords('IR SPECTRUM', 'INFRARED', 'FTIR', ' IR ')),
+    ('Raman', _keywords('RAMAN')),
+    ('UV-Vis', _keywords('UV', 'VISIBLE', 'UV-VIS', 'ABSORPTION')),
+    ('LIBS', _keywords('LIBS')),
+    ('XRF', _keywords('XRF', 'X-RAY')),
+)
+_ORIGIN_TECHNIQUES = (
+    ('IR', _keywords('FTIR', 'INFRARED')),
+    ('Raman', _keywords('RAMAN')),
+    ('UV-Vis', _keywords('UV', 'VISIBLE')),
+)
+_FILENAME_TECHNIQUES = (
+    ('IR', _keywords('-IR.', '_IR.', 'IR-', 'IR_', 'INFRARED')),
+    ('Raman', _keywords('-RAMAN.', '_RAMAN.', 'RAMAN-', 'RAMAN_')),
+    ('UV-Vis', _keywords('-UV.', '_UV.', 'UV-', 'UV_', '-VIS.', '_VIS.')),
+)
+_WAVENUMBER_UNITS = _keywords('1/CM', 'CM-1', 'CM^-1', 'WAVENUMBER')
+_WAVELENGTH_UNITS = _keywords('NM', 'NANOMETER')
+_ABSORPTION_UNITS = _keywords('TRANSMITTANCE', 'ABSORBANCE', '%T')
+_EMISSION_UNITS = _keywords('INTENSITY', 'COUNTS', 'ARBITRARY')
+_UV_VIS_UNITS = _keywords('ABSORBANCE', 'TRANSMITTANCE')
+_LIBS_UNITS = _keywords('INTENSITY', 'COUNTS')
+# Characters ignored when comparing JCAMP-DX labels
+_LABEL_NOISE = re.compile(r'[\s_]')
+
+# JCAMP-DX labels the (X++(Y..Y)) fast path has to look at
+_XY_DATA_LABEL = re.compile(rb'^##[ \t]*(?i:xydata)[ \t]*=[ \t]*\(X\+\+\(Y\.\.Y\)\)[ \t]*$', re.M)
+_ANY_XYDATA_LABEL = re.compile(rb'^##[ \t]*(?i:xydata)[ \t]*=', re.M)
+_TITLE_LABEL = re.compile(rb'^##[ \t]*(?i:title)[ \t]*=', re.M)
+_COMMENT_LINE = re.compile(rb'^\$\$.*$', re.M)
+# Anything but plain (AFFN) numbers means SQZ/DIF/DUP compressed data
+_NOT_AFFN = re.compile(rb'[^0-9.+\-,\s]')
+# Leading "##" label of a JCAMP-DX file
+_JCAMP_START = re.compile(rb'\s*##')
+_LEADING_SPACE = re.compile(rb'\s*')
+
+
+def _classify(value: str, techniques: Sequence[Tuple[str, re.Pattern]]) -> Optional[str]:
+    """First technique whose keywords occur in value, or None"""
+    for technique, pattern in techniques:
+        if pattern.search(value):
+            return technique
+    return None
+
+
+def value_range(values: Sequence[float]) -> Optional[Tuple[float, float]]:
+    """(min, max) of values via numpy's vectorized reductions, or None when empty"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return None
+    return float(np.minimum.reduce(values)), float(np.maximum.reduce(values))
+
 
 class SpectralFileParser:
-    """Utility class for parsing different spectral file formats"""
+    """
+    Utility class for parsing different spectral file formats.
+    All methods are static and keep no per-call state (the parse cache is
+    lock-guarded), so endpoints can run them in worker threads concurrently.
+    """
     
     @staticmethod
     def calculate_file_hash(content: bytes) -> str:
@@ -18,20 +112,40 @@ class SpectralFileParser:
         return hashlib.sha256(content).hexdigest()
     
     @staticmethod
-    def parse_csv_spectrum(content: str, filename: str) -> Tuple[List[float], List[float], Dict[str, Any]]:
+    def read_and_hash(file_obj: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[bytearray, str]:
+        """
+        Read a binary file object to the end, updating the SHA-256 as each chunk
+        arrives instead of hashing the assembled content in a second pass
+        Returns: (content, hex digest)
+        """
+        hasher = hashlib.sha256()
+        content = bytearray()
+        while chunk := file_obj.read(chunk_size):
+            hasher.update(chunk)
+            content += chunk
+        return content, hasher.hexdigest()
+    
+    @staticmethod
+    def parse_csv_spectrum(content: Union[bytes, str], filename: str) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
         """
         Parse CSV file with wavelength,intensity pairs
         Expected format: wavelength,intensity (with optional header)
+        Works on the raw bytes; the columns are parsed by numpy in one call and
+        returned as float64 arrays
         """
-        lines = content.strip().split('\n')
-        if not lines:
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        start = _LEADING_SPACE.match(content).end()
+        if start == len(content):
             raise ValueError("Empty CSV file")
         
-        # Check if first line is a header
-        first_line = lines[0].strip()
+        # Check if first line is a header (float() accepts bytes and ignores a trailing \r).
+        # Only the start of the line is sliced out, however long the line is.
+        probe_end = content.find(b'\n', start, start + HEADER_PROBE_SIZE)
+        first_line = content[start:probe_end if probe_end != -1 else start + HEADER_PROBE_SIZE]
         try:
             # Try to parse first line as numbers
-            values = first_line.split(',')
+            values = first_line.split(b',', 2)
             float(values[0])
             float(values[1])
             has_header = False
@@ -39,36 +153,33 @@ class SpectralFileParser:
             has_header = True
         
         # Parse data
-        wavelengths = []
-        intensities = []
-        start_idx = 1 if has_header else 0
-        
-        for i, line in enumerate(lines[start_idx:], start_idx + 1):
-            line = line.strip()
-            if not line:
-                continue
-            
-            try:
-                parts = line.split(',')
-                if len(parts) < 2:
-                    raise ValueError(f"Invalid format at line {i}: expected wavelength,intensity")
-                
-                wavelength = float(parts[0])
-                intensity = float(parts[1])
-                
-                wavelengths.append(wavelength)
-                intensities.append(intensity)
-            except ValueError as e:
-                raise ValueError(f"Error parsing line {i}: {e}")
+        stream = BytesIO(content)
+        stream.seek(start)
+        try:
+            with warnings.catch_warnings():
+                # A file without data rows is reported below, not as a numpy warning
+                warnings.simplefilter("ignore", UserWarning)
+                wavelengths, intensities = np.loadtxt(
+                    stream,
+                    delimiter=',',
+                    encoding='latin-1',
+                    skiprows=1 if has_header else 0,
+                    usecols=(0, 1),
+                    dtype=np.float64,
+                    ndmin=2,
+                    unpack=True
+                )
+        except ValueError as e:
+            raise ValueError(f"Error parsing CSV data: {e}")
         
-        if not wavelengths:
+        if wavelengths.size == 0:
             raise ValueError("No valid data points found in CSV file")
         
         # Do not determine technique for CSV files - metadata-only detection
         metadata = {
             "original_format": "CSV",
-            "data_points": len(wavelengths),
-            "wavelength_range": [min(wavelengths), max(wavelengths)],
+            "data_points": int(wavelengths.size),
+            "wavelength_range": list(value_range(wavelengths)),
             "has_header": has_header,
             "technique": "Unknown"  # CSV files don't have metadata to determine technique
         }
@@ -76,51 +187,105 @@ class SpectralFileParser:
         return wavelengths, intensities, metadata
     
     @staticmethod
-    def parse_jcamp_spectrum(content: str, filename: str) -> Tuple[List[float], List[float], Dict[str, Any]]:
-        """Parse JCAMP-DX format spectral file"""
+    def _decode_text(content: bytes) -> str:
+        """Decode file text as UTF-8, falling back to Latin-1"""
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            return content.decode('latin-1')
+    
+    @staticmethod
+    def _read_jcamp(content: bytes) -> Dict[str, Any]:
+        """
+        Read JCAMP-DX content into the dict jcamp.jcamp_read returns (lowercased
+        labels plus 'x'/'y' arrays). A single ##XYDATA=(X++(Y..Y)) block written in
+        plain numbers is decoded here in one numpy conversion and only the header
+        is decoded to text and goes through jcamp; compressed data, other layouts
+        and compound files are left to jcamp entirely.
+        """
+        text = content.replace(b'\r', b'')
+        label = _XY_DATA_LABEL.search(text)
+        if (
+            label is None
+            or len(_ANY_XYDATA_LABEL.findall(text)) > 1
+            or len(_TITLE_LABEL.findall(text)) > 1
+        ):
+            return jcamp.jcamp_read(StringIO(SpectralFileParser._decode_text(content)))
+        
+        # The data lines run up to the next ## label
+        end = text.find(b'\n##', label.end())
+        end = len(text) if end == -1 else end + 1
+        data = text[label.end():end]
+        if b'$' in data:
+            data = _COMMENT_LINE.sub(b'', data)
+        if _NOT_AFFN.search(data):
+            return jcamp.jcamp_read(StringIO(SpectralFileParser._decode_text(content)))
+        
+        # In packed (PAC) form a sign also separates values, as in "4000-12+5"
+        data = data.replace(b'-', b' -').replace(b'+', b' +').replace(b',', b' ')
+        rows = [row for row in (line.split() for line in data.split(b'\n')) if row]
+        counts = np.fromiter((len(row) - 1 for row in rows), dtype=np.int64, count=len(rows))
+        if counts.size == 0 or not counts.all():
+            # Let jcamp report lines without Y values the way it always has
+            return jcamp.jcamp_read(StringIO(SpectralFileParser._decode_text(content)))
+        
+        header = SpectralFileParser._decode_text(text[:label.start()] + text[end:])
+        jcamp_data = jcamp.jcamp_read(StringIO(header))
+        jcamp_data['xydata'] = '(X++(Y..Y))'
+        
+        # One X plus its Y values per row, converted straight into a pre-sized array
+        values = np.fromiter(
+            map(float, chain.from_iterable(rows)), dtype=np.float64, count=int(counts.sum()) + counts.size
+        )
+        starts = np.zeros(counts.size, dtype=np.int64)
+        np.cumsum(counts[:-1] + 1, out=starts[1:])
+        y = np.delete(values, starts)
+        
+        # Same X reconstruction as jcamp: each line spans from its own X to the next
+        # line's, and the last line ends at ##LASTX
+        xstart = values[starts]
+        lastx = float(jcamp_data['lastx'])
+        dx = np.empty(counts.size)
+        dx[:-1] = (xstart[1:] - xstart[:-1]) / counts[:-1]
+        dx[-1] = (lastx - xstart[-1]) / (counts[-1] - 1) if counts[-1] > 1 else 0.0
+        offsets = np.arange(y.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        x = np.repeat(xstart, counts) + np.repeat(dx, counts) * offsets
+        if counts[-1] == 1:
+            x[-1] = lastx
+        
+        if 'xfactor' in jcamp_data:
+            x = x * jcamp_data['xfactor']
+        if 'yfactor' in jcamp_data:
+            y = y * jcamp_data['yfactor']
+        jcamp_data['x'] = x
+        jcamp_data['y'] = y
+        return jcamp_data
+    
+    @staticmethod
+    def parse_jcamp_spectrum(content: Union[bytes, str], filename: str) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Parse JCAMP-DX format spectral file from its raw bytes"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
         try:
             # Parse JCAMP data
-            jcamp_data = jcamp.jcamp_read(StringIO(content))
-            
-            # Extract wavelengths/wavenumbers and intensities
-            x_data = jcamp_data.get('x', [])
-            y_data = jcamp_data.get('y', [])
+            jcamp_data = SpectralFileParser._read_jcamp(content)
             
-            # Handle the case where x_data or y_data might be numpy arrays or empty
-            x_empty = len(x_data) == 0 if hasattr(x_data, '__len__') else not x_data
-            y_empty = len(y_data) == 0 if hasattr(y_data, '__len__') else not y_data
+            # Extract wavelengths/wavenumbers and intensities (no copy when jcamp already produced float64 arrays)
+            wavelengths = np.asarray(jcamp_data.get('x', ()), dtype=np.float64)
+            intensities = np.asarray(jcamp_data.get('y', ()), dtype=np.float64)
             
-            if x_empty or y_empty:
+            if wavelengths.size == 0 or intensities.size == 0:
                 raise ValueError("No spectral data found in JCAMP file")
             
-            # Convert to lists if numpy arrays
-            wavelengths = x_data.tolist() if hasattr(x_data, 'tolist') else list(x_data)
-            intensities = y_data.tolist() if hasattr(y_data, 'tolist') else list(y_data)
-            
             # Add filename to jcamp_data for filename-based detection
             jcamp_data['_filename'] = filename
             
             # Determine technique from JCAMP metadata
             technique = SpectralFileParser._determine_technique_from_jcamp_metadata(jcamp_data)
             
-            # Log debugging information - print all available keys first
-            logger.info(f"JCAMP file '{filename}' - All available metadata keys:")
-            for key in sorted(jcamp_data.keys()):
-                logger.info(f"  '{key}': {jcamp_data[key]}")
-            
-            logger.info(f"JCAMP file '{filename}' metadata analysis:")
-            logger.info(f"  Data Type: {jcamp_data.get('datatype', jcamp_data.get('data type', 'Not found'))}")
-            logger.info(f"  Title: {jcamp_data.get('title', 'Not found')}")
-            logger.info(f"  X Units: {jcamp_data.get('xunits', 'Not found')}")
-            logger.info(f"  Y Units: {jcamp_data.get('yunits', 'Not found')}")
-            logger.info(f"  Origin: {jcamp_data.get('origin', 'Not found')}")
-            logger.info(f"  Detected technique: {technique}")
-            
-            # Also print to console for immediate debugging
-            print(f"JCAMP file '{filename}' - All available metadata keys:")
-            for key in sorted(jcamp_data.keys()):
-                print(f"  '{key}': {jcamp_data[key]}")
-            print(f"Detected technique: {technique}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("JCAMP file %s metadata keys: %s", filename, sorted(jcamp_data))
+                logger.debug("JCAMP file %s detected technique: %s", filename, technique)
             
             # Do not fall back to wavelength range analysis - removed as per user requirements
             # Keep technique as "Unknown" if metadata doesn't provide clear indication
@@ -128,8 +293,8 @@ class SpectralFileParser:
             # Extract metadata
             metadata = {
                 "original_format": "JCAMP-DX",
-                "data_points": len(wavelengths),
-                "wavelength_range": [min(wavelengths), max(wavelengths)],
+                "data_points": int(wavelengths.size),
+                "wavelength_range": list(value_range(wavelengths)),
                 "jcamp_version": jcamp_data.get('jcamp_version', 'Unknown'),
                 "title": jcamp_data.get('title', ''),
                 "origin": jcamp_data.get('origin', ''),
@@ -166,79 +331,44 @@ class SpectralFileParser:
         3. ##XUNITS= and ##YUNITS= field analysis
         4. Other metadata fields
         """
-        # Check DATA TYPE field first (most reliable) - try multiple possible field names including ## prefix
-        data_type_fields = [
-            'data type', 'DATA TYPE', 'datatype', 'DATATYPE', 'data_type', 'DATA_TYPE',
-            '##data type', '##DATA TYPE', '##datatype', '##DATATYPE', '##data_type', '##DATA_TYPE'
-        ]
-        data_type = ''
+        # JCAMP-DX labels compare case-, space- and underscore-insensitively and may keep
+        # their ## prefix, so index the fields once by normalized label
+        fields = {
+            _LABEL_NOISE.sub('', key.lstrip('#').lower()): value
+            for key, value in jcamp_data.items()
+        }
         
-        for field in data_type_fields:
-            if field in jcamp_data:
-                data_type = str(jcamp_data[field]).upper()
-                break
+        def field(label: str) -> str:
+            value = fields.get(label)
+            return str(value).upper() if value is not None else ''
         
-        if data_type:
-            print(f"Found DATA TYPE field: '{data_type}'")
-            if any(keyword in data_type for keyword in ['INFRARED', 'IR SPECTRUM', 'FTIR']):
-                return 'IR'
-            elif 'RAMAN' in data_type:
-                return 'Raman'
-            elif any(keyword in data_type for keyword in ['ULTRAVIOLET', 'UV', 'VISIBLE', 'UV/VIS']):
-                return 'UV-Vis'
-            elif any(keyword in data_type for keyword in ['MASS', 'MS']):
-                return 'MS'
-            elif 'NMR' in data_type:
-                return 'NMR'
+        # Check DATA TYPE field first (most reliable)
+        data_type = field('datatype')
         
-        # Check title field - try multiple possible title field names including ## prefix
-        title_fields = [
-            'title', 'TITLE', 'Title', 
-            '##title', '##TITLE', '##Title'
-        ]
-        title = ''
+        if data_type:
+            technique = _classify(data_type, _DATA_TYPE_TECHNIQUES)
+            if technique:
+                return technique
         
-        for field in title_fields:
-            if field in jcamp_data:
-                title = str(jcamp_data[field]).upper()
-                break
+        # Check title field
+        title = field('title')
         
         if title:
-            print(f"Found TITLE field: '{title}'")
             # Look for explicit technique mentions
-            if any(keyword in title for keyword in ['IR SPECTRUM', 'INFRARED', 'FTIR', ' IR ']):
-                return 'IR'
-            elif 'RAMAN' in title:
-                return 'Raman'
-            elif any(keyword in title for keyword in ['UV', 'VISIBLE', 'UV-VIS', 'ABSORPTION']):
-                return 'UV-Vis'
-            elif 'LIBS' in title:
-                return 'LIBS'
-            elif any(keyword in title for keyword in ['XRF', 'X-RAY']):
-                return 'XRF'
-        
-        # Check units for additional clues - try with and without ## prefix
-        xunits_fields = ['xunits', 'XUNITS', '##xunits', '##XUNITS']
-        yunits_fields = ['yunits', 'YUNITS', '##yunits', '##YUNITS']
+            technique = _classify(title, _TITLE_TECHNIQUES)
+            if technique:
+                return technique
         
-        xunits = ''
-        for field in xunits_fields:
-            if field in jcamp_data:
-                xunits = str(jcamp_data[field]).upper()
-                break
-                
-        yunits = ''
-        for field in yunits_fields:
-            if field in jcamp_data:
-                yunits = str(jcamp_data[field]).upper()
-                break
+        # Check units for additional clues
+        xunits = field('xunits')
+        yunits = field('yunits')
         
         if xunits:
             # Wavenumber units (cm⁻¹) with transmittance/absorbance suggests IR
-            if any(unit in xunits for unit in ['1/CM', 'CM-1', 'CM^-1', 'WAVENUMBER']):
-                if any(unit in yunits for unit in ['TRANSMITTANCE', 'ABSORBANCE', '%T']):
+            if _WAVENUMBER_UNITS.search(xunits):
+                if _ABSORPTION_UNITS.search(yunits):
                     return 'IR'
-                elif any(unit in yunits for unit in ['INTENSITY', 'COUNTS', 'ARBITRARY']):
+                elif _EMISSION_UNITS.search(yunits):
                     # Could be Raman or IR, need more context
                     # Check if title or data type gives more clues
                     if 'RAMAN' in title:
@@ -247,84 +377,69 @@ class SpectralFileParser:
                     return 'IR'
             
             # Wavelength units (nm) typically indicate UV-Vis or LIBS
-            elif any(unit in xunits for unit in ['NM', 'NANOMETER']):
-                if any(unit in yunits for unit in ['ABSORBANCE', 'TRANSMITTANCE']):
+            elif _WAVELENGTH_UNITS.search(xunits):
+                if _UV_VIS_UNITS.search(yunits):
                     return 'UV-Vis'
-                elif any(unit in yunits for unit in ['INTENSITY', 'COUNTS']):
+                elif _LIBS_UNITS.search(yunits):
                     return 'LIBS'
         
-        # Check origin field for instrument-specific clues - try with and without ## prefix
-        origin_fields = ['origin', 'ORIGIN', '##origin', '##ORIGIN']
-        origin = ''
-        for field in origin_fields:
-            if field in jcamp_data:
-                origin = str(jcamp_data[field]).upper()
-                break
-                
+        # Check origin field for instrument-specific clues
+        origin = field('origin')
+        
         if origin:
-            if any(keyword in origin for keyword in ['FTIR', 'INFRARED']):
-                return 'IR'
-            elif 'RAMAN' in origin:
-                return 'Raman'
-            elif any(keyword in origin for keyword in ['UV', 'VISIBLE']):
-                return 'UV-Vis'
+            technique = _classify(origin, _ORIGIN_TECHNIQUES)
+            if technique:
+                return technique
         
         # Check filename as a last resort fallback
         # This handles cases like "108-95-2-IR.jdx" where metadata might be missing
         filename_upper = str(jcamp_data.get('_filename', '')).upper()
         if filename_upper:
-            if any(keyword in filename_upper for keyword in ['-IR.', '_IR.', 'IR-', 'IR_', 'INFRARED']):
-                print(f"Detected IR from filename: {filename_upper}")
-                return 'IR'
-            elif any(keyword in filename_upper for keyword in ['-RAMAN.', '_RAMAN.', 'RAMAN-', 'RAMAN_']):
-                print(f"Detected Raman from filename: {filename_upper}")
-                return 'Raman'
-            elif any(keyword in filename_upper for keyword in ['-UV.', '_UV.', 'UV-', 'UV_', '-VIS.', '_VIS.']):
-                print(f"Detected UV-Vis from filename: {filename_upper}")
-                return 'UV-Vis'
+            technique = _classify(filename_upper, _FILENAME_TECHNIQUES)
+            if technique:
+                logger.debug("Detected %s from filename: %s", technique, filename_upper)
+                return technique
         
         return "Unknown"
     
     @staticmethod
-    def _determine_technique_from_wavelengths(wavelengths: List[float]) -> str:
-        """DEPRECATED: Do not use wavelength-based technique detection"""
-        # This method has been deprecated as per user requirements
-        # Always return Unknown to force metadata-based detection only
-        return "Unknown"
-    
-    @staticmethod
-    def parse_spectrum_file(content: bytes, filename: str) -> Tuple[List[float], List[float], Dict[str, Any], str]:
+    def parse_spectrum_file(
+        content: Union[bytes, BinaryIO],
+        filename: str,
+        *,
+        file_hash: Optional[str] = None
+    ) -> Tuple[Sequence[float], Sequence[float], Dict[str, Any], str]:
         """
         Main entry point for parsing spectral files
+        Accepts raw bytes or a binary file-like object (e.g. a spooled upload).
+        Pass file_hash when the caller already hashed the content while reading it.
+        Results are cached by content hash and filename, so re-uploading the same
+        file skips parsing; the returned arrays are shared and must not be modified.
         Returns: (wavelengths, intensities, metadata, technique)
         """
-        # Calculate file hash
-        file_hash = SpectralFileParser.calculate_file_hash(content)
+        if not isinstance(content, (bytes, bytearray)):
+            if file_hash is None:
+                content, file_hash = SpectralFileParser.read_and_hash(content)
+            else:
+                content = content.read()
         
-        # Decode content
-        try:
-            text_content = content.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                text_content = content.decode('latin-1')
-            except UnicodeDecodeError:
-                raise ValueError("Unable to decode file content")
+        # Calculate file hash
+        if file_hash is None:
+            file_hash = SpectralFileParser.calculate_file_hash(content)
         
-        # Determine file format from extension
-        filename_lower = filename.lower()
+        cache_key = (file_hash, filename)
+        with _parsed_files_lock:
+            cached = _parsed_files.get(cache_key)
+        if cached is not None:
+            wavelengths, intensities, metadata, technique = cached
+            return wavelengths, intensities, dict(metadata), technique
         
-        if filename_lower.endswith('.csv'):
-            wavelengths, intensities, metadata = SpectralFileParser.parse_csv_spectrum(text_content, filename)
-        elif filename_lower.endswith(('.dx', '.jdx', '.jcamp')):
-            wavelengths, intensities, metadata = SpectralFileParser.parse_jcamp_spectrum(text_content, filename)
+        # Determine file format from the leading bytes; the extension only decides
+        # for JCAMP files that do not open with a ## label (e.g. a $$ comment first)
+        if _JCAMP_START.match(content) or filename.lower().endswith(JCAMP_EXTENSIONS):
+            wavelengths, intensities, metadata = SpectralFileParser.parse_jcamp_spectrum(content, filename)
         else:
-            # Try to auto-detect format
-            if text_content.strip().startswith('##'):
-                # Looks like JCAMP
-                wavelengths, intensities, metadata = SpectralFileParser.parse_jcamp_spectrum(text_content, filename)
-            else:
-                # Try CSV format
-                wavelengths, intensities, metadata = SpectralFileParser.parse_csv_spectrum(text_content, filename)
+            wavelengths, intensities, metadata = SpectralFileParser.parse_csv_spectrum(content, filename)
         
         # Add file hash to metadata
         metadata['file_hash'] = file_hash
@@ -332,4 +447,12 @@ class SpectralFileParser:
         # Get technique from metadata if available (JCAMP files store it there)
         technique = metadata.get('technique', 'Unknown')
         
+        for values in (wavelengths, intensities):
+            if isinstance(values, np.ndarray):
+                values.flags.writeable = False
+        entry = (wavelengths, intensities, dict(metadata), technique)
+        if _parsed_size(entry) <= PARSE_CACHE_BYTES:
+            with _parsed_files_lock:
+                _parsed_files[cache_key] = entry
+        
         return wavelengths, intensities, metadata, technique
\ No newline at end of file
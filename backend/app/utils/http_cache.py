@@ -0,0 +1,40 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response
+
+# Clients may reuse a listing for a few seconds, then must revalidate with the ETag
+CACHE_CONTROL = "private, max-age=5"
+
+
+def list_etag(*version: Any) -> str:
+    """Build a strong ETag from the values that identify a version of a listing"""
+    return '"' + hashlib.blake2b(repr(version).encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header value matches the ETag: "*" matches anything,
+    otherwise each comma-separated tag is compared whole, ignoring a W/ prefix
+    (If-None-Match uses the weak comparison)
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set the caching headers on the outgoing response and return a 304 response
+    if the client already holds this version (If-None-Match), otherwise None
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
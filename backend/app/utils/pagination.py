@@ -0,0 +1,24 @@
+from typing import Any, Optional, Sequence
+from fastapi import Response
+from sqlalchemy import Select
+
+# Response header carrying the cursor for the next keyset page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def paginate(query: Select, id_column: Any, skip: int, limit: int, after_id: Optional[int]) -> Select:
+    """
+    Order a list query by id and apply pagination. With after_id the page is
+    located through the primary key index (WHERE id > after_id) instead of
+    OFFSET, which has to scan and discard every skipped row.
+    """
+    query = query.order_by(id_column)
+    if after_id is not None:
+        return query.where(id_column > after_id).limit(limit)
+    return query.offset(skip).limit(limit)
+
+
+def set_next_cursor(response: Response, last_ids: Sequence[int], limit: int) -> None:
+    """Advertise the after_id for the next page when this page came back full"""
+    if limit and len(last_ids) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(last_ids[-1])
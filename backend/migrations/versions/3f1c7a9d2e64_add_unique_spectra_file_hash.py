@@ -0,0 +1,24 @@
+"""Add unique index on spectra.file_hash
+
+Revision ID: 3f1c7a9d2e64
+Revises: 819e7a40512d
+Create Date: 2026-10-15 21:34:10.271903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c7a9d2e64'
+down_revision = '819e7a40512d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_spectra_file_hash'), 'spectra', ['file_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_spectra_file_hash'), table_name='spectra')
@@ -0,0 +1,56 @@
+"""Store spectrum wavelengths and intensities as packed float64 binary
+
+Revision ID: 6d2e8b41c0a7
+Revises: 3f1c7a9d2e64
+Create Date: 2026-10-15 22:05:48.613520
+
+"""
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2e8b41c0a7'
+down_revision = '3f1c7a9d2e64'
+branch_labels = None
+depends_on = None
+
+ARRAY_COLUMNS = ('wavelengths', 'intensities')
+FLOAT64_LE = np.dtype('<f8')
+
+
+def _convert(from_type, to_type, convert) -> None:
+    """Copy every array column into a temporary column of to_type, then swap it in"""
+    with op.batch_alter_table('spectra') as batch_op:
+        for name in ARRAY_COLUMNS:
+            batch_op.add_column(sa.Column(f'{name}_new', to_type, nullable=True))
+
+    bind = op.get_bind()
+    spectra = sa.table(
+        'spectra',
+        sa.column('id', sa.Integer),
+        *(sa.column(name, from_type) for name in ARRAY_COLUMNS),
+        *(sa.column(f'{name}_new', to_type) for name in ARRAY_COLUMNS),
+    )
+    rows = bind.execute(sa.select(spectra.c.id, *(spectra.c[name] for name in ARRAY_COLUMNS))).all()
+    for row in rows:
+        bind.execute(
+            spectra.update()
+            .where(spectra.c.id == row.id)
+            .values({f'{name}_new': convert(getattr(row, name)) for name in ARRAY_COLUMNS})
+        )
+
+    with op.batch_alter_table('spectra') as batch_op:
+        for name in ARRAY_COLUMNS:
+            batch_op.drop_column(name)
+        for name in ARRAY_COLUMNS:
+            batch_op.alter_column(f'{name}_new', new_column_name=name, existing_type=to_type, nullable=False)
+
+
+def upgrade() -> None:
+    _convert(sa.JSON(), sa.LargeBinary(), lambda values: np.asarray(values or [], dtype=FLOAT64_LE).tobytes())
+
+
+def downgrade() -> None:
+    _convert(sa.LargeBinary(), sa.JSON(), lambda data: np.frombuffer(data or b'', dtype=FLOAT64_LE).tolist())
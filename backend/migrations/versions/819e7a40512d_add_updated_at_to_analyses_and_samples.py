@@ -0,0 +1,28 @@
+"""Add updated_at to analyses and samples
+
+Revision ID: 819e7a40512d
+Revises: b5b55efb77ef
+Create Date: 2026-10-15 11:02:37.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '819e7a40512d'
+down_revision = 'b5b55efb77ef'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('analyses', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('samples', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('samples') as batch_op:
+        batch_op.drop_column('updated_at')
+    with op.batch_alter_table('analyses') as batch_op:
+        batch_op.drop_column('updated_at')
\ No newline at end of file
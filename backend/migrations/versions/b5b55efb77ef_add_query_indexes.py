@@ -0,0 +1,28 @@
+"""Add indexes for list and lookup queries
+
+Revision ID: b5b55efb77ef
+Revises: 9ca512c1ea78
+Create Date: 2026-10-15 10:12:44.518209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5b55efb77ef'
+down_revision = '9ca512c1ea78'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_analyses_spectrum_method_created', 'analyses', ['spectrum_id', 'method_name', sa.text('created_at DESC')], unique=False)
+    op.create_index('uq_samples_project_sample', 'samples', ['project_id', 'sample_id'], unique=True)
+    op.create_index(op.f('ix_spectra_sample_id'), 'spectra', ['sample_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_spectra_sample_id'), table_name='spectra')
+    op.drop_index('uq_samples_project_sample', table_name='samples')
+    op.drop_index('ix_analyses_spectrum_method_created', table_name='analyses')
\ No newline at end of file
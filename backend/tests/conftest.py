@@ -2,36 +2,64 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.core.database import get_db, Base
 
-# Test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-app.dependency_overrides[get_db] = override_get_db
+@pytest.fixture
+def db_path(tmp_path):
+    """Per-test SQLite file, so tests never share or leave behind a database"""
+    return tmp_path / "test.db"
 
 @pytest.fixture
-def client():
+def engine(db_path):
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
     Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def client(engine, db_path):
+    # The app itself talks to the database through an async session
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
-    Base.metadata.drop_all(bind=engine)
+    app.dependency_overrides.pop(get_db, None)
 
 @pytest.fixture
-def db_session():
-    Base.metadata.create_all(bind=engine)
+def db_session(engine):
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
\ No newline at end of file
+
+@pytest.fixture
+def sample(client):
+    """A project with one sample, created through the API"""
+    project = client.post("/api/v1/projects/", json={"name": "Project", "owner_id": 1}).json()
+    return client.post(
+        "/api/v1/samples/", json={"sample_id": "S-1", "name": "Sample", "project_id": project["id"]}
+    ).json()
+
+@pytest.fixture
+def spectrum(client, sample):
+    """A three-point IR spectrum on the sample fixture"""
+    return client.post("/api/v1/spectra/", json={
+        "sample_id": sample["id"],
+        "technique": "IR",
+        "filename": "spectrum.csv",
+        "wavelengths": [4000.0, 3000.0, 2000.0],
+        "intensities": [0.95, 0.9, 0.5]
+    }).json()
@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+
+def test_analysis_created_by_token_user(client: TestClient, db_session, spectrum):
+    # A second user, so the token user is not the demo fallback id 1
+    db_session.add(User(username="bob", email="bob@example.com", password_hash=get_password_hash("secret")))
+    user = User(username="alice", email="alice@example.com", password_hash=get_password_hash("secret"))
+    db_session.add(user)
+    db_session.commit()
+    assert user.id != 1
+    token = create_access_token({"sub": "alice"})
+
+    response = client.post(
+        "/api/v1/analysis/",
+        json={"spectrum_id": spectrum["id"], "method_name": "peak_detection"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["created_by"] == user.id
+
+def test_analysis_without_token_uses_demo_user(client: TestClient, spectrum):
+    response = client.post("/api/v1/analysis/", json={"spectrum_id": spectrum["id"], "method_name": "peak_detection"})
+    assert response.status_code == 200
+    assert response.json()["created_by"] == 1
+
+def test_analysis_update_records_history(client: TestClient, spectrum):
+    analysis = client.post(
+        "/api/v1/analysis/",
+        json={"spectrum_id": spectrum["id"], "method_name": "peak_detection", "results": {"peaks": []}}
+    ).json()
+
+    response = client.put(f"/api/v1/analysis/{analysis['id']}", json={"results": {"peaks": [3000.0]}})
+    assert response.status_code == 200
+    assert response.json()["results"] == {"peaks": [3000.0]}
+
+    history = client.get(f"/api/v1/analysis/{analysis['id']}/history").json()
+    assert len(history) == 1
+    assert history[0]["previous_results"]["results"] == {"peaks": []}
+    assert history[0]["new_results"]["results"] == {"peaks": [3000.0]}
+
+def test_create_analyses_bulk(client: TestClient, sample, spectrum):
+    other = client.post("/api/v1/spectra/", json={
+        "sample_id": sample["id"],
+        "technique": "Raman",
+        "filename": "other.csv",
+        "wavelengths": [100.0, 200.0],
+        "intensities": [1.0, 2.0]
+    }).json()
+    rows = [
+        {"spectrum_id": other["id"], "method_name": "smoothing", "parameters": {"window": 5}},
+        {"spectrum_id": spectrum["id"], "method_name": "peak_detection"},
+        {"spectrum_id": other["id"], "method_name": "baseline_correction"}
+    ]
+
+    response = client.post("/api/v1/analysis/bulk", json=rows)
+    assert response.status_code == 200
+    created = response.json()
+    assert [(item["spectrum_id"], item["method_name"]) for item in created] == [
+        (row["spectrum_id"], row["method_name"]) for row in rows
+    ]
+    assert created[0]["parameters"] == {"window": 5}
+    assert all(item["created_by"] == 1 for item in created)
+    assert len({item["id"] for item in created}) == 3
+    assert len(client.get("/api/v1/analysis/").json()) == 3
+
+def test_create_analyses_bulk_missing_spectrum(client: TestClient, spectrum):
+    rows = [
+        {"spectrum_id": spectrum["id"], "method_name": "peak_detection"},
+        {"spectrum_id": spectrum["id"] + 100, "method_name": "peak_detection"}
+    ]
+    response = client.post("/api/v1/analysis/bulk", json=rows)
+    assert response.status_code == 404
+    assert str(spectrum["id"] + 100) in response.json()["detail"]
+    assert client.get("/api/v1/analysis/").json() == []
@@ -0,0 +1,88 @@
+import pytest
+from app.utils.file_parsers import SpectralFileParser
+
+def test_parse_csv_with_header():
+    wavelengths, intensities, metadata, technique = SpectralFileParser.parse_spectrum_file(
+        b"wavelength,intensity\n200,100\n400,150.5\r\n\n600,120\n", "sample.csv"
+    )
+    assert list(wavelengths) == [200.0, 400.0, 600.0]
+    assert list(intensities) == [100.0, 150.5, 120.0]
+    assert metadata["has_header"] is True
+    assert metadata["wavelength_range"] == [200.0, 600.0]
+    assert technique == "Unknown"
+
+def test_parse_csv_without_header():
+    wavelengths, intensities, metadata, _ = SpectralFileParser.parse_spectrum_file(b"2,1\n1,3\n", "sample.csv")
+    assert list(wavelengths) == [2.0, 1.0]
+    assert list(intensities) == [1.0, 3.0]
+    assert metadata["has_header"] is False
+    assert metadata["wavelength_range"] == [1.0, 2.0]
+
+def test_parse_csv_rejects_bad_rows():
+    with pytest.raises(ValueError):
+        SpectralFileParser.parse_spectrum_file(b"wavelength,intensity\n1,2\n3,abc\n", "sample.csv")
+    with pytest.raises(ValueError):
+        SpectralFileParser.parse_spectrum_file(b"wavelength,intensity\n", "sample.csv")
+
+def test_parse_jcamp_detects_technique():
+    content = (
+        b"##TITLE= Test\n##JCAMP-DX= 4.24\n##DATA TYPE= INFRARED SPECTRUM\n"
+        b"##XUNITS= 1/CM\n##YUNITS= TRANSMITTANCE\n##FIRSTX= 4000\n##LASTX= 2000\n##NPOINTS= 3\n"
+        b"##XYDATA= (X++(Y..Y))\n4000 0.95\n3000 0.9\n2000 0.5\n##END=\n"
+    )
+    wavelengths, intensities, metadata, technique = SpectralFileParser.parse_spectrum_file(content, "test.jdx")
+    assert list(wavelengths) == [4000.0, 3000.0, 2000.0]
+    assert list(intensities) == [0.95, 0.9, 0.5]
+    assert metadata["wavelength_range"] == [2000.0, 4000.0]
+    assert technique == "IR"
+
+def test_file_object_is_hashed_while_reading():
+    import io
+    content = b"1,2\n3,4\n" * 20000
+    _, _, metadata, _ = SpectralFileParser.parse_spectrum_file(io.BytesIO(content), "sample.csv")
+    assert metadata["file_hash"] == SpectralFileParser.calculate_file_hash(content)
+
+def test_jcamp_xydata_matches_jcamp_package():
+    import io
+    import jcamp
+    header = "##TITLE= Test\n##XFACTOR= 0.5\n##YFACTOR= 0.01\n##FIRSTX= 8000\n##LASTX= 7993\n##NPOINTS= 8\n"
+    for data in ("8000 12 -3 45\r\n$$ note\n7994-7+100 3\n7988 5\n", "8000@A B C\n7994J%jK\n"):
+        content = header + "##XYDATA= (X++(Y..Y))\n" + data + "##END=\n"
+        expected = jcamp.jcamp_read(io.StringIO(content))
+        parsed = SpectralFileParser._read_jcamp(content.encode())
+        assert parsed["x"].tolist() == expected["x"].tolist()
+        assert parsed["y"].tolist() == expected["y"].tolist()
+        assert parsed["title"] == "Test" and parsed["xydata"] == "(X++(Y..Y))"
+
+def test_parse_results_are_cached_by_hash():
+    content = b"wavelength,intensity\n10,1\n20,2\n"
+    first = SpectralFileParser.parse_spectrum_file(content, "cached.csv")
+    second = SpectralFileParser.parse_spectrum_file(content, "cached.csv")
+    assert second[0] is first[0] and second[1] is first[1]
+    assert second[2] == first[2] and second[2] is not first[2]
+    assert not first[0].flags.writeable
+
+def test_jcamp_detected_from_content():
+    content = (
+        b"\n##TITLE= Raman test\n##FIRSTX= 100\n##LASTX= 300\n##NPOINTS= 3\n"
+        b"##XYDATA= (X++(Y..Y))\n100 5 6 7\n##END=\n"
+    )
+    for filename in ("spectrum.csv", "spectrum.txt"):
+        wavelengths, _, metadata, technique = SpectralFileParser.parse_spectrum_file(content, filename)
+        assert metadata["original_format"] == "JCAMP-DX"
+        assert list(wavelengths) == [100.0, 200.0, 300.0]
+        assert technique == "Raman"
+
+def test_jcamp_file_object_without_hash():
+    import io
+    content = (
+        b"##TITLE= File object\n##DATA TYPE= INFRARED SPECTRUM\n##FIRSTX= 1000\n##LASTX= 1003\n"
+        b"##NPOINTS= 4\n##XYDATA= (X++(Y..Y))\n1000 1 2\n1002 3 4\n##END=\n"
+    )
+    wavelengths, intensities, metadata, technique = SpectralFileParser.parse_spectrum_file(io.BytesIO(content), "object.jdx")
+    assert list(wavelengths) == [1000.0, 1001.0, 1002.0, 1003.0]
+    assert list(intensities) == [1.0, 2.0, 3.0, 4.0]
+    assert metadata["file_hash"] == SpectralFileParser.calculate_file_hash(content)
+    assert technique == "IR"
+    _, bytearray_intensities, _, _ = SpectralFileParser.parse_spectrum_file(bytearray(content), "other.jdx")
+    assert list(bytearray_intensities) == [1.0, 2.0, 3.0, 4.0]
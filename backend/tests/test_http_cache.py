@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+from app.utils.http_cache import etag_matches
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"xyz", W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('', '"abc"')
+    assert not etag_matches('"ab"', '"abc"')
+    assert not etag_matches('"abc", "def"', '"ab"')
+
+def test_unchanged_listing_returns_304(client: TestClient, sample):
+    response = client.get("/api/v1/projects/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    assert client.get("/api/v1/projects/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/projects/", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/api/v1/projects/", headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get("/api/v1/projects/", headers={"If-None-Match": etag[:-2] + '"'}).status_code == 200
+
+def test_etag_changes_after_put_within_the_same_second(client: TestClient):
+    project = client.post("/api/v1/projects/", json={"name": "A", "owner_id": 1}).json()
+    etags = [client.get("/api/v1/projects/").headers["etag"]]
+    for name in ("B", "C"):
+        assert client.put(f"/api/v1/projects/{project['id']}", json={"name": name}).status_code == 200
+        response = client.get("/api/v1/projects/", headers={"If-None-Match": etags[-1]})
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == name
+        etags.append(response.headers["etag"])
+    assert len(set(etags)) == 3
+
+def test_etag_changes_after_post_and_delete(client: TestClient, sample):
+    etag = client.get("/api/v1/samples/").headers["etag"]
+
+    client.post("/api/v1/samples/", json={"sample_id": "S-2", "name": "Sample 2", "project_id": sample["project_id"]})
+    response = client.get("/api/v1/samples/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    etag = response.headers["etag"]
+
+    assert client.delete(f"/api/v1/samples/{sample['id']}").status_code == 200
+    response = client.get("/api/v1/samples/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+def test_analysis_etag_changes_after_update(client: TestClient, spectrum):
+    analysis = client.post("/api/v1/analysis/", json={"spectrum_id": spectrum["id"], "method_name": "peak_detection"}).json()
+    etag = client.get("/api/v1/analysis/").headers["etag"]
+
+    client.put(f"/api/v1/analysis/{analysis['id']}", json={"results": {"peaks": [1]}})
+    assert client.get("/api/v1/analysis/", headers={"If-None-Match": etag}).status_code == 200
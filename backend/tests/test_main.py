@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from app.main import app
 
 def test_root_endpoint(client: TestClient):
     response = client.get("/")
@@ -9,4 +10,12 @@ def test_root_endpoint(client: TestClient):
 def test_health_check(client: TestClient):
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
\ No newline at end of file
+    assert response.json() == {"status": "healthy"}
+
+def test_no_duplicate_routes():
+    seen = set()
+    for route in app.routes:
+        for method in getattr(route, "methods", None) or [None]:
+            key = (route.path, method)
+            assert key not in seen, f"duplicate route {key}"
+            seen.add(key)
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+def test_project_pagination_cursor(client: TestClient):
+    for name in ("P1", "P2", "P3"):
+        client.post("/api/v1/projects/", json={"name": name, "owner_id": 1})
+
+    response = client.get("/api/v1/projects/", params={"limit": 2})
+    assert [project["name"] for project in response.json()] == ["P1", "P2"]
+    cursor = response.headers["x-next-cursor"]
+
+    response = client.get("/api/v1/projects/", params={"limit": 2, "after_id": cursor})
+    assert [project["name"] for project in response.json()] == ["P3"]
+    assert "x-next-cursor" not in response.headers
+
+def test_duplicate_project_name(client: TestClient):
+    assert client.post("/api/v1/projects/", json={"name": "Project", "owner_id": 1}).status_code == 200
+    response = client.post("/api/v1/projects/", json={"name": "Project", "owner_id": 1})
+    assert response.status_code == 400
+
+    other = client.post("/api/v1/projects/", json={"name": "Other", "owner_id": 1}).json()
+    assert client.put(f"/api/v1/projects/{other['id']}", json={"name": "Project"}).status_code == 400
+
+def test_delete_project_removes_children(client: TestClient, sample, spectrum):
+    analysis = client.post("/api/v1/analysis/", json={"spectrum_id": spectrum["id"], "method_name": "peak_detection"}).json()
+
+    response = client.delete(f"/api/v1/projects/{sample['project_id']}")
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+    assert client.get(f"/api/v1/projects/{sample['project_id']}").status_code == 404
+    assert client.get(f"/api/v1/samples/{sample['id']}").status_code == 404
+    assert client.get(f"/api/v1/spectra/{spectrum['id']}").status_code == 404
+    assert client.get(f"/api/v1/analysis/{analysis['id']}").status_code == 404
@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+def test_duplicate_sample_id_in_project(client: TestClient, sample):
+    response = client.post(
+        "/api/v1/samples/", json={"sample_id": "S-1", "name": "Again", "project_id": sample["project_id"]}
+    )
+    assert response.status_code == 400
+
+    # The same sample_id is fine in another project
+    project = client.post("/api/v1/projects/", json={"name": "Other", "owner_id": 1}).json()
+    response = client.post("/api/v1/samples/", json={"sample_id": "S-1", "name": "Sample", "project_id": project["id"]})
+    assert response.status_code == 200
+
+def test_sample_pagination_cursor(client: TestClient, sample):
+    for sample_id in ("S-2", "S-3"):
+        client.post("/api/v1/samples/", json={"sample_id": sample_id, "name": sample_id, "project_id": sample["project_id"]})
+
+    response = client.get("/api/v1/samples/", params={"limit": 2})
+    assert [item["sample_id"] for item in response.json()] == ["S-1", "S-2"]
+
+    response = client.get("/api/v1/samples/", params={"limit": 2, "after_id": response.headers["x-next-cursor"]})
+    assert [item["sample_id"] for item in response.json()] == ["S-3"]
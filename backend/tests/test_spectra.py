@@ -0,0 +1,70 @@
+import orjson
+import pytest
+from pydantic import ValidationError
+from fastapi.testclient import TestClient
+from app.schemas.spectrum import SpectrumCreate
+
+CSV_CONTENT = b"wavelength,intensity\n4000,0.95\n3000,0.9\n2000,0.5\n"
+
+def test_upload_and_duplicate_upload(client: TestClient, sample):
+    files = {"file": ("spectrum.csv", CSV_CONTENT, "text/csv")}
+    response = client.post("/api/v1/spectra/upload", data={"sample_id": sample["id"]}, files=files)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["data_points"] == 3
+
+    spectrum = client.get(f"/api/v1/spectra/{body['spectrum_id']}").json()
+    assert spectrum["wavelengths"] == [4000.0, 3000.0, 2000.0]
+    assert spectrum["intensities"] == [0.95, 0.9, 0.5]
+
+    response = client.post("/api/v1/spectra/upload", data={"sample_id": sample["id"]}, files=files)
+    assert response.status_code == 400
+    assert str(body["spectrum_id"]) in response.json()["detail"]
+
+def test_export_csv_round_trip(client: TestClient, spectrum):
+    response = client.get(f"/api/v1/spectra/{spectrum['id']}/export", params={"format": "csv"})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == "wavelength,intensity"
+    rows = [tuple(map(float, line.split(","))) for line in lines[1:]]
+    assert rows == list(zip(spectrum["wavelengths"], spectrum["intensities"]))
+
+def test_export_json_round_trip(client: TestClient, spectrum):
+    response = client.get(f"/api/v1/spectra/{spectrum['id']}/export", params={"format": "json"})
+    assert response.status_code == 200
+    data = orjson.loads(response.content)
+    assert data["wavelengths"] == spectrum["wavelengths"]
+    assert data["intensities"] == spectrum["intensities"]
+
+def test_export_jcamp_round_trip(client: TestClient, spectrum):
+    response = client.get(f"/api/v1/spectra/{spectrum['id']}/export", params={"format": "jcamp"})
+    assert response.status_code == 200
+    text = response.text
+    data = text.split("##XYDATA=", 1)[1].split("\n", 1)[1].split("##END=", 1)[0]
+    rows = [tuple(map(float, line.split())) for line in data.splitlines() if line.strip()]
+    assert rows == list(zip(spectrum["wavelengths"], spectrum["intensities"]))
+
+def test_create_spectrum_rejects_null_and_non_finite_values(client: TestClient, sample):
+    for wavelengths in ([4000.0, None, 2000.0], [4000.0, "inf", 2000.0], [4000.0, "nan", 2000.0]):
+        response = client.post("/api/v1/spectra/", json={
+            "sample_id": sample["id"],
+            "technique": "IR",
+            "filename": "spectrum.csv",
+            "wavelengths": wavelengths,
+            "intensities": [0.95, 0.9, 0.5]
+        })
+        assert response.status_code == 422
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_spectrum_schema_rejects_non_finite_values(value):
+    with pytest.raises(ValidationError):
+        SpectrumCreate(sample_id=1, technique="IR", filename="spectrum.csv", wavelengths=[1.0, value], intensities=[1.0, 2.0])
+
+def test_list_spectra_data_points(client: TestClient, spectrum):
+    response = client.get("/api/v1/spectra/")
+    assert response.status_code == 200
+    summary, = response.json()
+    assert summary["id"] == spectrum["id"]
+    assert summary["data_points"] == 3
+    assert "wavelengths" not in summary
@@ -33,7 +33,7 @@ import {
 } from '@mui/icons-material';
 import FileUpload from '../components/FileUpload';
 import SpectrumViewer from '../components/SpectrumViewer';
-import { Spectrum, Sample, FileUploadResponse } from '../types';
+import { Spectrum, SpectrumSummary, Sample, FileUploadResponse } from '../types';
 import { useNavigate } from 'react-router-dom';
 import { apiService } from '../services/api';
 import { useNotificationStore } from '../services/store';
@@ -64,7 +64,7 @@ const Spectra: React.FC = () => {
   const navigate = useNavigate();
   const { addNotification } = useNotificationStore();
   const [tabValue, setTabValue] = useState(1);
-  const [spectra, setSpectra] = useState<Spectrum[]>([]);
+  const [spectra, setSpectra] = useState<SpectrumSummary[]>([]);
   const [samples, setSamples] = useState<Sample[]>([]);
   const [selectedSpectrum, setSelectedSpectrum] = useState<Spectrum | null>(null);
   const [loading, setLoading] = useState(false);
@@ -112,13 +112,32 @@ const Spectra: React.FC = () => {
     setError(null);
   };
 
-  const handleViewSpectrum = (spectrum: Spectrum) => {
-    setSelectedSpectrum(spectrum);
-    setViewerOpen(true);
+  // The list only carries summaries; fetch the data arrays when a spectrum is opened
+  const loadFullSpectrum = async (spectrum: SpectrumSummary | Spectrum): Promise<Spectrum | null> => {
+    if ('wavelengths' in spectrum) {
+      return spectrum;
+    }
+    try {
+      return await apiService.getSpectrum(spectrum.id);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load spectrum');
+      return null;
+    }
   };
 
-  const handleAnalyzeSpectrum = (spectrum: Spectrum) => {
-    navigate('/analysis', { state: { spectrum } });
+  const handleViewSpectrum = async (spectrum: SpectrumSummary) => {
+    const fullSpectrum = await loadFullSpectrum(spectrum);
+    if (fullSpectrum) {
+      setSelectedSpectrum(fullSpectrum);
+      setViewerOpen(true);
+    }
+  };
+
+  const handleAnalyzeSpectrum = async (spectrum: SpectrumSummary | Spectrum) => {
+    const fullSpectrum = await loadFullSpectrum(spectrum);
+    if (fullSpectrum) {
+      navigate('/analysis', { state: { spectrum: fullSpectrum } });
+    }
   };
 
   const handleDeleteSpectrum = async (spectrumId: number) => {
@@ -434,7 +453,7 @@ const Spectra: React.FC = () => {
                         <Box>
                           <Typography variant="body2" color="textSecondary">
                             Sample: {getSampleName(spectrum.sample_id)} • 
-                            Data Points: {spectrum.wavelengths?.length || 0} • 
+                            Data Points: {spectrum.data_points} • 
                             Uploaded: {new Date(spectrum.created_at).toLocaleDateString()}
                           </Typography>
                         </Box>
@@ -8,8 +8,10 @@ import {
   Sample,
   SampleCreate,
   Spectrum,
+  SpectrumSummary,
   SpectrumCreate,
   Analysis,
+  AnalysisListItem,
   AnalysisCreate,
   LoginCredentials,
   AuthToken,
@@ -188,10 +190,10 @@ class ApiService {
   }
 
   // Spectra
-  async getSpectra(sampleId?: string): Promise<Spectrum[]> {
+  async getSpectra(sampleId?: string): Promise<SpectrumSummary[]> {
     const url = sampleId ? `/spectra/?sample_id=${sampleId}` : '/spectra/';
     try {
-      const response = await this.api.get<Spectrum[]>(url);
+      const response = await this.api.get<SpectrumSummary[]>(url);
       return response.data;
     } catch (error: any) {
       if (error.response?.data?.detail) {
@@ -230,7 +232,7 @@ class ApiService {
   }
 
   // Analysis
-  async getAnalyses(spectrumId?: string, methodName?: string): Promise<Analysis[]> {
+  async getAnalyses(spectrumId?: string, methodName?: string): Promise<AnalysisListItem[]> {
     let url = '/analysis/';
     const params = new URLSearchParams();
     
@@ -241,7 +243,7 @@ class ApiService {
       url += `?${params.toString()}`;
     }
     
-    return this.request<Analysis[]>('GET', url);
+    return this.request<AnalysisListItem[]>('GET', url);
   }
 
   async getAnalysis(analysisId: string): Promise<Analysis> {
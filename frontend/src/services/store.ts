@@ -5,7 +5,9 @@ import {
   Project,
   Sample,
   Spectrum,
+  SpectrumSummary,
   Analysis,
+  AnalysisListItem,
   Notification,
 } from '../types';
 import { apiService } from './api';
@@ -41,7 +43,7 @@ interface SampleState {
 }
 
 interface SpectrumState {
-  spectra: Spectrum[];
+  spectra: SpectrumSummary[];
   currentSpectrum: Spectrum | null;
   loading: boolean;
   error: string | null;
@@ -52,7 +54,7 @@ interface SpectrumState {
 }
 
 interface AnalysisState {
-  analyses: Analysis[];
+  analyses: AnalysisListItem[];
   loading: boolean;
   error: string | null;
   loadAnalyses: (spectrumId?: string) => Promise<void>;
@@ -255,7 +257,9 @@ export const useSpectrumStore = create<SpectrumState>((set, get) => ({
   uploadSpectrum: async (file: File, sampleId: string) => {
     try {
       const spectrum = await apiService.uploadSpectrum(file, sampleId);
-      set(state => ({ spectra: [...state.spectra, spectrum] }));
+      set(state => ({
+        spectra: [...state.spectra, { ...spectrum, data_points: spectrum.wavelengths?.length || 0 }],
+      }));
       return spectrum;
     } catch (error: any) {
       set({ error: error.message });
@@ -90,6 +90,11 @@ export interface Spectrum {
   file_hash?: string;
 }
 
+// Spectrum as returned by the list endpoint (without the data arrays)
+export type SpectrumSummary = Omit<Spectrum, 'wavelengths' | 'intensities'> & {
+  data_points: number;
+};
+
 export interface SpectrumCreate {
   sample_id: string;
   technique: SpectroscopicTechnique;
@@ -110,6 +115,9 @@ export interface Analysis {
   created_at: string;
 }
 
+// Analysis as returned by the list endpoint (without parameters/results)
+export type AnalysisListItem = Omit<Analysis, 'parameters' | 'results'>;
+
 export interface AnalysisCreate {
   spectrum_id: number;
   method_name: string;